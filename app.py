@@ -1,22 +1,48 @@
+import os
+
+import click
 from flask import Flask, jsonify
 
-from db import db
+import migrations
+from cache import department_cache, employee_id_cache
+from cli import register_commands
+from config import Config
+from db import apply_sqlite_pragmas, db
+from group_commit import init_group_commit
+from json_provider import provider_class
+from metrics import init_metrics
+from profiling import init_profiling
 from routes import api_bp
-from seed_data import seed_database
+from security import token_cache
 
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
-    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///hr.db"
-    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config.from_object(Config)
+    if config:
+        app.config.update(config)
 
+    app.json = provider_class(app.config["JSON_ENCODER"])(app)
     db.init_app(app)
+    department_cache.ttl = app.config["DEPARTMENT_CACHE_TTL"]
+    employee_id_cache.maxsize = app.config["EMPLOYEE_ID_CACHE_SIZE"]
+    token_cache.ttl = app.config["AUTH_CACHE_TTL"]
+    token_cache.maxsize = app.config["AUTH_CACHE_SIZE"]
 
     with app.app_context():
-        db.create_all()
-        seed_database()
+        apply_sqlite_pragmas(db.engine, app.config["SQLITE_PRAGMAS"])
+        if not _loaded_for_cli_command():
+            migrations.ensure_schema(auto_upgrade=app.config["AUTO_MIGRATE"])
+            if app.config["SEED_ON_STARTUP"]:
+                from seed_data import seed_database
+
+                seed_database()
 
     app.register_blueprint(api_bp)
+    init_metrics(app)
+    init_profiling(app)
+    init_group_commit(app)
+    register_commands(app)
 
     @app.get("/")
     def health():
@@ -25,9 +51,23 @@ def create_app():
     return app
 
 
+def _loaded_for_cli_command():
+    """True when a ``flask`` command other than ``run`` is loading the app.
+
+    Those commands handle the schema and data themselves; migrating or
+    seeding on load would run first and defeat ``init-db --no-seed`` or
+    ``db current``.
+    """
+    if os.environ.get("FLASK_RUN_FROM_CLI") != "true":
+        return False
+    ctx = click.get_current_context(silent=True)
+    return ctx is None or ctx.info_name != "run"
+
+
 app = create_app()
 
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    # Debug mode only when asked for (FLASK_DEBUG=1); production uses gunicorn.
+    app.run()
 
@@ -0,0 +1,339 @@
+"""Drive every API endpoint through the test client and report its cost.
+
+The app is built against a fresh database holding the demo seed plus a
+``generate-data`` dataset of the requested size. Each endpoint is called
+``--iterations`` times after a warm-up; the report gives throughput,
+p50/p95/p99 latency, SQL statements per request, and peak Python memory
+allocated while serving one request (measured on a separate call, since
+tracing slows everything down). Run from the repository root::
+
+    python benchmarks/endpoints.py --employees 2000 --json run.json
+    python benchmarks/endpoints.py --employees 2000 --baseline run.json
+
+With ``--baseline`` the run exits non-zero when an endpoint's p95 grew by
+more than ``--tolerance`` or it issues more SQL statements than before.
+The temporary database is deleted when the run finishes.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+END_DATE = date(2026, 1, 1)
+EXPORT_MONTH = "2025-11"
+LOGIN = {"email": "maya.chen@example.com", "password": "password123"}
+
+# (name, method, path, request kwargs, max iterations). ``path`` and the
+# kwargs are formatted per call with the run context and iteration ``i``, so
+# write endpoints touch a different row each time. Login and employee
+# creation are capped because each one runs the password KDF.
+ENDPOINTS = [
+    ("auth.login", "POST", "/auth/login", {"json": LOGIN}, 5),
+    ("auth.me", "GET", "/auth/me", {"headers": "auth"}, None),
+    ("employees.list_page", "GET", "/employees?limit=100", {}, None),
+    ("employees.list_compact", "GET", "/employees?view=compact", {}, None),
+    ("employees.stream", "GET", "/employees?stream=1", {}, None),
+    ("employees.get", "GET", "/employees/{employee_id}", {}, None),
+    ("employees.leave_summary", "GET", "/employees/{employee_id}/leave-summary", {}, None),
+    ("employees.create", "POST", "/employees", {"json": "new_employee"}, 5),
+    ("employees.bulk", "POST", "/employees/bulk", {"data": "bulk_csv", "content_type": "text/csv"}, 5),
+    ("employees.update", "PATCH", "/employees/{employee_id}", {"json": {"role": "Benchmarker"}}, None),
+    ("departments.list", "GET", "/departments", {}, None),
+    ("departments.create", "POST", "/departments", {"json": "new_department"}, None),
+    ("leaves.list_filtered", "GET", "/leaves?status=approved&department_id={department_id}&from=2025-10-01&to=2025-12-31", {}, None),
+    ("leaves.by_employee", "GET", "/leaves?employee_id={employee_id}", {}, None),
+    ("leaves.calendar", "GET", "/leaves/calendar?from=2025-12-01&to=2025-12-31&department_id={department_id}", {}, None),
+    ("leaves.conflicts", "GET", "/leaves/conflicts?department_id={department_id}", {}, None),
+    ("leaves.get", "GET", "/leaves/{leave_id}", {}, None),
+    ("leaves.create", "POST", "/leaves", {"json": "new_leave"}, None),
+    ("leaves.update", "PATCH", "/leaves/{leave_id}", {"json": {"reason": "Benchmark"}}, None),
+    ("leaves.bulk_approve", "POST", "/leaves/bulk-approve", {"json": "leave_batch"}, None),
+    ("attendance.history", "GET", "/attendance/{employee_id}?from=2025-11-01&to=2025-11-30&limit=50", {}, None),
+    ("attendance.summary", "GET", "/attendance/{employee_id}/summary?granularity=week&from=2025-10-01", {}, None),
+    ("attendance.department_summary", "GET", "/attendance/departments/{department_id}/summary?granularity=month", {}, None),
+    ("attendance.export_csv", "GET", f"/attendance/export?month={EXPORT_MONTH}&format=csv", {}, 10),
+    ("attendance.check_in_out", "POST", "/attendance/check-in", {"json": "check_in"}, None),
+    ("attendance.batch", "POST", "/attendance/batch", {"json": "batch_events"}, None),
+    ("batch.dashboard", "POST", "/batch", {"json": "dashboard", "headers": "auth"}, None),
+]
+
+
+def _request_kwargs(spec, context, i):
+    employee_id = context["employee_ids"][i % len(context["employee_ids"])]
+    kwargs = {}
+    for key, value in spec.items():
+        if value == "auth":
+            value = {"Authorization": f"Bearer {context['token']}"}
+        elif value == "new_employee":
+            value = {
+                "first_name": "Bench",
+                "last_name": "Mark",
+                "email": f"bench.{context['run']}.{i}@example.com",
+                "department_id": context["department_id"],
+                "role": "Benchmarker",
+                "password": "password123",
+            }
+        elif value == "new_leave":
+            value = {
+                "employee_id": employee_id,
+                "start_date": f"2027-{1 + i // 28 % 12:02d}-{1 + i % 28:02d}",
+                "end_date": f"2027-{1 + i // 28 % 12:02d}-{1 + i % 28:02d}",
+                "reason": "Benchmark",
+                "leave_type": "vacation",
+            }
+        elif value == "bulk_csv":
+            value = "first_name,last_name,email,department_id\n" + "".join(
+                f"Bulk,Row,bulk.{context['run']}.{i}.{row}@example.com,"
+                f"{context['department_id']}\n"
+                for row in range(20)
+            )
+        elif value == "new_department":
+            value = {"name": f"Benchmark {context['run']}.{i}"}
+        elif value == "leave_batch":
+            leave_ids = context["leave_ids"]
+            value = {"leave_ids": [leave_ids[(i * 10 + n) % len(leave_ids)] for n in range(10)]}
+        elif value == "dashboard":
+            value = {
+                "requests": [
+                    {"path": "/auth/me"},
+                    {"path": f"/employees/{employee_id}"},
+                    {"path": f"/employees/{employee_id}/leave-summary"},
+                    {"path": f"/leaves?employee_id={employee_id}"},
+                    {"path": f"/attendance/{employee_id}?limit=50"},
+                ]
+            }
+        elif value == "check_in":
+            value = {"employee_id": employee_id}
+        elif value == "batch_events":
+            day = f"2026-02-{1 + i % 28:02d}"
+            value = {
+                "events": [
+                    {"employee_id": employee_id, "type": "check_in", "timestamp": f"{day}T09:00:00"},
+                    {"employee_id": employee_id, "type": "check_out", "timestamp": f"{day}T17:00:00"},
+                ]
+            }
+        kwargs[key] = value
+    return kwargs
+
+
+def _call(client, context, name, method, path, spec, i):
+    employee_id = context["employee_ids"][i % len(context["employee_ids"])]
+    url = path.format(
+        employee_id=employee_id,
+        department_id=context["department_id"],
+        leave_id=context["leave_ids"][i % len(context["leave_ids"])],
+    )
+    response = client.open(url, method=method, **_request_kwargs(spec, context, i))
+    response.get_data()
+    status = response.status_code
+    response.close()
+    if name == "attendance.check_in_out" and status < 400:
+        response = client.post("/attendance/check-out", json={"employee_id": employee_id})
+        response.close()
+        status = max(status, response.status_code)
+    return status
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _build_context(app, employees, departments, years, seed):
+    import synthetic_data
+    from models import Department, Employee, LeaveRequest
+
+    with app.app_context():
+        counts = synthetic_data.generate(
+            departments=departments,
+            employees=employees,
+            years=years,
+            seed=seed,
+            end_date=END_DATE,
+        )
+        department_id = Department.query.order_by(Department.id.desc()).first().id
+        employee_ids = [
+            row.id
+            for row in Employee.query.with_entities(Employee.id)
+            .filter(Employee.department_id == department_id)
+            .order_by(Employee.id)
+        ]
+        leave_ids = [
+            row.id
+            for row in LeaveRequest.query.with_entities(LeaveRequest.id)
+            .order_by(LeaveRequest.id)
+            .limit(1000)
+        ]
+    return counts, {
+        "department_id": department_id,
+        "employee_ids": employee_ids,
+        "leave_ids": leave_ids,
+        "run": int(time.time()),
+    }
+
+
+def run(employees, departments, years, seed, iterations, warmup, only=None):
+    tmp = tempfile.mkdtemp(prefix="hr-bench-")
+    os.environ.update(
+        DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+        SECRET_KEY="endpoint-benchmark",
+        SEED_ON_STARTUP="1",
+    )
+    sys.path.insert(0, ROOT)
+    from sqlalchemy import event
+
+    from app import app
+    from db import db
+
+    try:
+        return _run(app, db, event, employees, departments, years, seed, iterations, warmup, only)
+    finally:
+        with app.app_context():
+            db.engine.dispose()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _run(app, db, event, employees, departments, years, seed, iterations, warmup, only):
+    counts, context = _build_context(app, employees, departments, years, seed)
+    client = app.test_client()
+    context["token"] = client.post("/auth/login", json=LOGIN).get_json()["token"]
+
+    statements = [0]
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statement(*_args):
+        statements[0] += 1
+
+    results = {}
+    call = 0
+    for name, method, path, spec, cap in ENDPOINTS:
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        runs = min(iterations, cap) if cap else iterations
+        for _ in range(min(warmup, runs)):
+            _call(client, context, name, method, path, spec, call)
+            call += 1
+
+        latencies = []
+        errors = 0
+        statements[0] = 0
+        started = time.perf_counter()
+        for _ in range(runs):
+            begin = time.perf_counter()
+            status = _call(client, context, name, method, path, spec, call)
+            latencies.append(time.perf_counter() - begin)
+            errors += status >= 400
+            call += 1
+        elapsed = time.perf_counter() - started
+        sql_per_request = statements[0] / runs
+
+        tracemalloc.start()
+        _call(client, context, name, method, path, spec, call)
+        call += 1
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results[name] = {
+            "requests": runs,
+            "errors": errors,
+            "throughput_rps": round(runs / elapsed, 1),
+            "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+            "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+            "sql_statements": round(sql_per_request, 2),
+            "peak_memory_kib": round(peak / 1024, 1),
+        }
+
+    return {
+        "meta": {
+            "employees": employees,
+            "departments": departments,
+            "years": years,
+            "seed": seed,
+            "iterations": iterations,
+            "dataset": counts,
+            "python": sys.version.split()[0],
+        },
+        "endpoints": results,
+    }
+
+
+def regressions(report, baseline, tolerance):
+    found = []
+    for name, current in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            found.append(f"{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+        if current["sql_statements"] > previous["sql_statements"]:
+            found.append(
+                f"{name}: SQL statements {previous['sql_statements']} -> "
+                f"{current['sql_statements']}"
+            )
+        if current["errors"] > previous["errors"]:
+            found.append(f"{name}: errors {previous['errors']} -> {current['errors']}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--departments", type=int, default=10)
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument(
+        "--only", action="append", help="Only endpoints whose name starts with this."
+    )
+    parser.add_argument("--json", metavar="PATH", help="Write the report here.")
+    parser.add_argument("--baseline", metavar="PATH", help="Fail on regressions.")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="Allowed p95 growth (0.25 = 25%%)."
+    )
+    args = parser.parse_args()
+
+    report = run(
+        args.employees, args.departments, args.years, args.seed,
+        args.iterations, args.warmup, args.only,
+    )
+
+    print(
+        f"{'endpoint':<30} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'SQL':>6} {'peak KiB':>9} {'err':>4}"
+    )
+    for name, stats in report["endpoints"].items():
+        print(
+            f"{name:<30} {stats['throughput_rps']:>8} {stats['p50_ms']:>8} "
+            f"{stats['p95_ms']:>8} {stats['p99_ms']:>8} {stats['sql_statements']:>6} "
+            f"{stats['peak_memory_kib']:>9} {stats['errors']:>4}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(report, handle, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            found = regressions(report, json.load(handle), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Measure how long a worker takes to import the app in each startup mode.
+
+Every sample is a fresh interpreter importing ``app`` against a database
+that ``flask init-db`` already prepared, which is what a pre-forked worker
+or a ``--reload`` restart pays. Run from the repository root::
+
+    python benchmarks/startup.py --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {
+    "framework-only": ({}, "import flask_sqlalchemy"),
+    "upgrade+seed": ({"AUTO_MIGRATE": "1", "SEED_ON_STARTUP": "1"}, "import app"),
+    "verify": ({"AUTO_MIGRATE": "0", "SEED_ON_STARTUP": "0"}, "import app"),
+}
+
+CHILD = (
+    "import time; start = time.perf_counter(); {statement}; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def _sample(env, statement):
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD.format(statement=statement)],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def run(runs):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'startup.db')}",
+            SECRET_KEY="startup-benchmark",
+        )
+        subprocess.run(
+            [sys.executable, "-m", "flask", "--app", "app", "init-db"],
+            cwd=ROOT,
+            env=env,
+            check=True,
+            capture_output=True,
+        )
+
+        results = {}
+        for name, (overrides, statement) in MODES.items():
+            samples = [_sample(dict(env, **overrides), statement) for _ in range(runs)]
+            results[name] = {
+                "runs": runs,
+                "median_ms": round(statistics.median(samples) * 1000, 1),
+                "min_ms": round(min(samples) * 1000, 1),
+                "max_ms": round(max(samples) * 1000, 1),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print JSON instead.")
+    args = parser.parse_args()
+
+    results = run(args.runs)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name, stats in results.items():
+        print(
+            f"{name:<16} median {stats['median_ms']:>7.1f} ms  "
+            f"min {stats['min_ms']:>7.1f} ms  max {stats['max_ms']:>7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
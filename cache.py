@@ -0,0 +1,198 @@
+"""In-process caches for rarely-changing reference data.
+
+Department writes in this process invalidate the department cache as soon as
+the transaction commits; other worker processes pick the change up once
+their copy is older than ``DEPARTMENT_CACHE_TTL`` seconds, or as soon as they
+are asked for a department their copy doesn't have yet. Employees are
+never deleted, so the employee id cache only ever needs to learn new ids.
+
+``models`` serializes departments from here, so models are imported where
+they are used rather than at the top.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from db import db
+
+_Snapshot = namedtuple("_Snapshot", "version loaded_at departments payloads")
+
+
+class DepartmentCache:
+    def __init__(self, ttl=30.0):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._version = 0
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._snapshot = None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "version": self._version,
+        }
+
+    def _fresh(self, snapshot):
+        return snapshot is not None and time.monotonic() - snapshot.loaded_at < self.ttl
+
+    def _current(self):
+        snapshot = self._snapshot
+        if self._fresh(snapshot):
+            self.hits += 1
+            return snapshot
+
+        self.misses += 1
+        with self._lock:
+            snapshot = self._snapshot
+            if not self._fresh(snapshot):
+                from models import Department
+
+                departments = Department.query.order_by(Department.id).all()
+                snapshot = _Snapshot(
+                    self._version,
+                    time.monotonic(),
+                    {dept.id: dept.to_dict() for dept in departments},
+                    {},
+                )
+                self._snapshot = snapshot
+        return snapshot
+
+    def get(self, department_id):
+        """Serialized department for ``department_id``, or ``None``.
+
+        A miss is confirmed against the database: a department another
+        worker created since this snapshot was loaded triggers a reload
+        instead of being reported missing.
+        """
+        try:
+            department_id = int(department_id)
+        except (TypeError, ValueError):
+            return None
+        snapshot = self._current()
+        department = snapshot.departments.get(department_id)
+        if department is None and self._exists(department_id):
+            self._drop(snapshot)
+            department = self._current().departments.get(department_id)
+        return department
+
+    def _exists(self, department_id):
+        from models import Department
+
+        return (
+            db.session.query(Department.id).filter(Department.id == department_id).first()
+            is not None
+        )
+
+    def _drop(self, snapshot):
+        # Only drop the snapshot that missed, so concurrent misses reload once.
+        with self._lock:
+            if self._snapshot is snapshot:
+                self._version += 1
+                self._snapshot = None
+
+    def ids(self):
+        return set(self._current().departments)
+
+    def list_payload(self, fields=None):
+        """``(etag, body)`` for ``{"departments": [...]}`` in the given fieldset."""
+        snapshot = self._current()
+        payload = snapshot.payloads.get(fields)
+        if payload is None:
+            departments = snapshot.departments.values()
+            if fields is not None:
+                departments = [
+                    {name: dept[name] for name in fields} for dept in departments
+                ]
+            body = current_app.json.dumps({"departments": list(departments)})
+            etag = hashlib.sha1(body.encode("utf-8")).hexdigest()
+            payload = snapshot.payloads[fields] = (etag, body)
+        return payload
+
+
+class EmployeeIdCache:
+    """Bounded LRU of employee ids known to exist.
+
+    Only hits are remembered: an unknown id may belong to an employee created
+    a moment later, possibly by another process.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._ids = OrderedDict()
+        self._lock = threading.Lock()
+
+    def exists(self, employee_id):
+        try:
+            employee_id = int(employee_id)
+        except (TypeError, ValueError):
+            return False
+        with self._lock:
+            if employee_id in self._ids:
+                self._ids.move_to_end(employee_id)
+                self.hits += 1
+                return True
+            self.misses += 1
+
+        from models import Employee
+
+        found = (
+            db.session.query(Employee.id).filter(Employee.id == employee_id).first()
+            is not None
+        )
+        if found:
+            with self._lock:
+                self._ids[employee_id] = None
+                while len(self._ids) > self.maxsize:
+                    self._ids.popitem(last=False)
+        return found
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size": len(self._ids),
+        }
+
+
+department_cache = DepartmentCache()
+employee_id_cache = EmployeeIdCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_department_writes(session, _flush_context):
+    from models import Department
+
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Department):
+            session.info["departments_changed"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("departments_changed", False):
+        department_cache.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_on_rollback(session, _previous_transaction):
+    session.info.pop("departments_changed", None)
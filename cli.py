@@ -0,0 +1,189 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+from sqlalchemy import select, update
+
+import migrations
+from db import db
+from models import Employee
+from security import hash_passwords, is_hashed
+
+db_cli = AppGroup("db", help="Schema migration and query-plan tools.")
+
+
+@click.command("init-db")
+@click.option("--seed/--no-seed", default=True, help="Load the demo data too.")
+@with_appcontext
+def init_db_command(seed):
+    """Create or upgrade the schema, then seed an empty database."""
+    migrations.upgrade()
+    click.echo(f"Schema is at version {migrations.HEAD_VERSION}.")
+    if seed:
+        _seed()
+
+
+@click.command("seed")
+@with_appcontext
+def seed_command():
+    """Load the demo data into an empty database."""
+    _require_schema()
+    _seed()
+
+
+@click.command("generate-data")
+@click.option("--departments", default=10, show_default=True, type=click.IntRange(1))
+@click.option("--employees", default=1000, show_default=True, type=click.IntRange(1))
+@click.option(
+    "--years", default=1.0, show_default=True, type=click.FloatRange(0, min_open=True),
+    help="Years of attendance history to generate.",
+)
+@click.option(
+    "--leave-density", default=4.0, show_default=True, type=click.FloatRange(0),
+    help="Leave requests per employee per year.",
+)
+@click.option(
+    "--attendance-rate", default=0.96, show_default=True, type=click.FloatRange(0, 1),
+    help="Share of working days each employee checks in.",
+)
+@click.option("--seed", default=42, show_default=True, help="Random seed.")
+@click.option(
+    "--end-date", type=click.DateTime(["%Y-%m-%d"]),
+    help="Last day of history is the day before this (default: today).",
+)
+@click.option("--batch-size", default=5000, show_default=True, type=click.IntRange(1))
+@with_appcontext
+def generate_data_command(
+    departments, employees, years, leave_density, attendance_rate, seed, end_date, batch_size
+):
+    """Insert a deterministic synthetic dataset for load testing."""
+    import time
+
+    import synthetic_data
+
+    _require_schema()
+    clashing_departments, clashing_emails = synthetic_data.conflicts(
+        departments, employees, seed
+    )
+    if clashing_departments or clashing_emails:
+        raise click.ClickException(
+            f"Seed {seed} would reuse {clashing_departments} existing department "
+            f"names and {clashing_emails} employee emails; use another --seed or "
+            "an empty database."
+        )
+
+    started = time.perf_counter()
+    counts = synthetic_data.generate(
+        departments=departments,
+        employees=employees,
+        years=years,
+        leave_density=leave_density,
+        attendance_rate=attendance_rate,
+        seed=seed,
+        end_date=end_date.date() if end_date else None,
+        batch_size=batch_size,
+    )
+    for table, count in counts.items():
+        click.echo(f"{table}: {count}")
+    click.echo(f"Generated in {time.perf_counter() - started:.1f}s.")
+
+
+def _require_schema():
+    # The CLI skips startup migration, so commands that write rows check (or,
+    # with AUTO_MIGRATE, bring up) the schema themselves.
+    try:
+        migrations.ensure_schema(auto_upgrade=current_app.config["AUTO_MIGRATE"])
+    except migrations.SchemaOutOfDate as exc:
+        raise click.ClickException(str(exc)) from None
+
+
+def _seed():
+    from seed_data import seed_database
+
+    if seed_database():
+        click.echo("Seeded demo data.")
+    else:
+        click.echo("Database already has data; nothing seeded.")
+
+
+@db_cli.command("upgrade")
+def upgrade_command():
+    """Apply pending schema migrations in place."""
+    applied = migrations.upgrade()
+    if applied:
+        click.echo(f"Applied migrations: {', '.join(map(str, applied))}.")
+    click.echo(f"Schema is at version {migrations.HEAD_VERSION}.")
+
+
+@db_cli.command("current")
+def current_command():
+    """Show the database schema version and any pending migrations.
+
+    Read-only: the CLI skips startup migration, so nothing is applied first.
+    """
+    with db.engine.connect() as connection:
+        version = migrations.current_version(connection)
+        pending = migrations.pending_migrations(connection)
+    click.echo(f"Current version: {version} (head: {migrations.HEAD_VERSION})")
+    for number, description, _statements in pending:
+        click.echo(f"  pending {number}: {description}")
+
+
+@db_cli.command("explain")
+@click.option("--strict", is_flag=True, help="Exit non-zero if any query scans.")
+def explain_command(strict):
+    """Report EXPLAIN QUERY PLAN for hot queries and flag table scans."""
+    from migrations.explain import plan_report
+
+    flagged = 0
+    for name, plan, scans in plan_report():
+        click.echo(f"{'SCAN' if scans else 'ok  '}  {name}")
+        for line in plan:
+            click.echo(f"        {line}")
+        flagged += bool(scans)
+    click.echo(f"{flagged} of the hot queries still scan.")
+    if strict and flagged:
+        raise SystemExit(1)
+
+
+attendance_cli = AppGroup("attendance", help="Attendance maintenance tools.")
+
+
+@attendance_cli.command("rebuild-rollups")
+def rebuild_rollups_command():
+    """Recompute the daily attendance rollup from raw attendance records."""
+    import rollups
+
+    _require_schema()
+    count = rollups.rebuild()
+    click.echo(f"Rebuilt {count} daily rollup rows.")
+
+
+auth_cli = AppGroup("auth", help="Authentication maintenance tools.")
+
+
+@auth_cli.command("hash-passwords")
+def hash_passwords_command():
+    """Hash any passwords still stored in plaintext."""
+    _require_schema()
+    rows = [
+        row
+        for row in db.session.execute(select(Employee.id, Employee.password))
+        if not is_hashed(row.password)
+    ]
+    if rows:
+        hashed = hash_passwords([row.password for row in rows])
+        db.session.execute(
+            update(Employee),
+            [{"id": row.id, "password": value} for row, value in zip(rows, hashed)],
+        )
+        db.session.commit()
+    click.echo(f"Hashed {len(rows)} plaintext passwords.")
+
+
+def register_commands(app):
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(seed_command)
+    app.cli.add_command(generate_data_command)
+    app.cli.add_command(db_cli)
+    app.cli.add_command(attendance_cli)
+    app.cli.add_command(auth_cli)
@@ -0,0 +1,71 @@
+import os
+import secrets
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+class Config:
+    SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL", "sqlite:///hr.db")
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": _env_int("DB_POOL_SIZE", 8),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 8),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 10),
+    }
+
+    AUTO_MIGRATE = _env_bool("AUTO_MIGRATE", True)
+    SEED_ON_STARTUP = _env_bool("SEED_ON_STARTUP", True)
+    JSON_ENCODER = os.environ.get("JSON_ENCODER", "auto").lower()
+
+    METRICS_ENABLED = _env_bool("METRICS_ENABLED", True)
+    # Shared directory for multi-process workers; unset keeps metrics per process.
+    METRICS_DIR = os.environ.get("METRICS_DIR") or None
+    METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL") or 5)
+
+    # Queue attendance check-ins/outs to one writer thread that commits them
+    # in groups, trading up to GROUP_COMMIT_MAX_DELAY_MS of latency for far
+    # fewer commits under load.
+    ATTENDANCE_GROUP_COMMIT = _env_bool("ATTENDANCE_GROUP_COMMIT", False)
+    GROUP_COMMIT_MAX_BATCH = _env_int("GROUP_COMMIT_MAX_BATCH", 64)
+    GROUP_COMMIT_MAX_DELAY_MS = float(os.environ.get("GROUP_COMMIT_MAX_DELAY_MS") or 2)
+
+    PROFILING = _env_bool("PROFILING", False)
+    PROFILE_SLOW_REQUEST_MS = _env_int("PROFILE_SLOW_REQUEST_MS", 500)
+    PROFILE_SLOW_QUERY_MS = _env_int("PROFILE_SLOW_QUERY_MS", 100)
+    PROFILE_ROUTE = os.environ.get("PROFILE_ROUTE") or None
+    PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE") or 0.01)
+    PROFILE_DIR = os.environ.get("PROFILE_DIR") or None
+
+    # Without SECRET_KEY set, tokens only verify in the process (or preforked
+    # workers) that issued them.
+    SECRET_KEY = os.environ.get("SECRET_KEY") or secrets.token_hex(32)
+    PASSWORD_HASH_METHOD = os.environ.get(
+        "PASSWORD_HASH_METHOD", "pbkdf2:sha256:600000"
+    )
+    AUTH_TOKEN_TTL = _env_int("AUTH_TOKEN_TTL", 12 * 60 * 60)
+    AUTH_CACHE_TTL = _env_int("AUTH_CACHE_TTL", 60)
+    AUTH_CACHE_SIZE = _env_int("AUTH_CACHE_SIZE", 10000)
+    AUTH_ALLOW_USER_ID_HEADER = _env_bool("AUTH_ALLOW_USER_ID_HEADER", False)
+    DEPARTMENT_CACHE_TTL = float(os.environ.get("DEPARTMENT_CACHE_TTL") or 30)
+    EMPLOYEE_ID_CACHE_SIZE = _env_int("EMPLOYEE_ID_CACHE_SIZE", 10000)
+
+    # Applied to every new SQLite connection, in this order. A value of None or
+    # "" leaves SQLite's own default in place.
+    SQLITE_PRAGMAS = {
+        "busy_timeout": _env_int("SQLITE_BUSY_TIMEOUT", 5000),
+        "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "cache_size": _env_int("SQLITE_CACHE_SIZE", -65536),
+        "mmap_size": _env_int("SQLITE_MMAP_SIZE", 268435456),
+        "temp_store": os.environ.get("SQLITE_TEMP_STORE", "MEMORY"),
+    }
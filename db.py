@@ -1,4 +1,25 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 
 db = SQLAlchemy()
 
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Run ``PRAGMA name = value`` on every connection the engine opens."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    statements = [
+        f"PRAGMA {name} = {value}"
+        for name, value in pragmas.items()
+        if value not in (None, "")
+    ]
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
@@ -0,0 +1,136 @@
+"""Group commit: fold many small write transactions into a few.
+
+With ``ATTENDANCE_GROUP_COMMIT`` on, request threads hand their write to
+``writer.run(work)`` instead of committing themselves. A single writer thread
+takes up to ``GROUP_COMMIT_MAX_BATCH`` queued jobs (waiting up to
+``GROUP_COMMIT_MAX_DELAY_MS`` for more while writes are backing up), runs
+each as ``work(session)`` in one transaction and commits once. Each caller gets its
+own return value or exception back only after that commit. Each job runs
+in its own savepoint, so a failing one is undone alone and never takes its
+neighbours down with it. If the commit itself fails, every job in the group
+gets that error.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sqlalchemy.orm import Session
+
+from db import db
+from metrics import registry
+
+
+class GroupCommitWriter:
+    def __init__(self):
+        self.engine = None
+        self.max_batch = 64
+        self.max_delay = 0.002
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # The writer thread does not survive a fork; a child starts its own.
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.engine is not None
+
+    def run(self, work):
+        """Run ``work(session)`` in the next group and return its result."""
+        future = Future()
+        self._queue.put((work, future))
+        if self._thread is None:
+            self._start()
+        return future.result()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name="group-commit", daemon=True
+                )
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            try:
+                self._drain(batch)
+                # A lone write is committed right away. Only when others
+                # queued up behind it (writes are arriving faster than single
+                # commits) is it worth holding the group open a little for more.
+                if len(batch) > 1:
+                    self._drain(batch, time.monotonic() + self.max_delay)
+                registry.observe("db_group_commit_size", (), len(batch))
+                self._commit(batch)
+            except Exception as exc:
+                # Never let the writer thread die: callers would wait forever.
+                _fail(batch, exc)
+
+    def _drain(self, batch, deadline=None):
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic() if deadline else 0
+            try:
+                if timeout > 0:
+                    batch.append(self._queue.get(timeout=timeout))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return
+
+    def _commit(self, batch):
+        outcomes = []
+        with Session(self.engine) as session:
+            _begin(session)
+            for work, future in batch:
+                # Each job gets a savepoint, so a failing one (a duplicate
+                # check-in, say) is undone alone and the rest still commit.
+                try:
+                    with session.begin_nested():
+                        outcomes.append((future, work(session), None))
+                except Exception as exc:
+                    outcomes.append((future, None, exc))
+            try:
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+
+        for future, result, exc in outcomes:
+            if exc is None:
+                future.set_result(result)
+            else:
+                future.set_exception(exc)
+
+
+def _begin(session):
+    connection = session.connection()
+    if connection.dialect.name == "sqlite":
+        # pysqlite only opens a transaction before DML, so a leading
+        # SAVEPOINT would start (and its RELEASE end) one of its own.
+        connection.exec_driver_sql("BEGIN")
+
+
+def _fail(batch, exc):
+    for _work, future in batch:
+        if not future.done():
+            future.set_exception(exc)
+
+
+writer = GroupCommitWriter()
+
+
+def init_group_commit(app):
+    config = app.config
+    if not config["ATTENDANCE_GROUP_COMMIT"]:
+        return
+    with app.app_context():
+        writer.engine = db.engine
+    writer.max_batch = config["GROUP_COMMIT_MAX_BATCH"]
+    writer.max_delay = config["GROUP_COMMIT_MAX_DELAY_MS"] / 1000
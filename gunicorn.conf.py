@@ -0,0 +1,50 @@
+"""Gunicorn settings for production: ``gunicorn -c gunicorn.conf.py app:app``.
+
+The app is imported once in the master (``preload_app``) and forked into the
+workers, so schema checks, model setup and imports are paid once. Each
+worker then drops the pooled connections it inherited, so no SQLite
+connection is ever shared between processes.
+
+Send ``HUP`` to the master to gracefully replace workers (config changes,
+leaks). Preloaded code is not re-imported by ``HUP``; to deploy new code,
+send ``USR2`` to start a new master next to the old one, then ``QUIT`` the
+old one once the new workers are up.
+"""
+
+import os
+
+
+def _cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY") or 2 * _cores() + 1)
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS") or 4)
+preload_app = True
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT") or 60)
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT") or 30)
+keepalive = 5
+# Recycle workers now and then so slow leaks can't accumulate; the jitter
+# keeps them from all restarting at once.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS") or 2000)
+max_requests_jitter = max_requests // 10
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-") or None
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    from app import app
+    from db import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False leaves the parent's connections alone and just
+            # forgets them here, so this worker opens its own.
+            engine.dispose(close=False)
@@ -0,0 +1,55 @@
+"""``app.json`` providers: orjson when it is installed, the stdlib otherwise.
+
+``JSON_ENCODER`` picks one: ``auto`` (default) uses orjson if it imports,
+``orjson`` requires it, and ``stdlib`` keeps Flask's own provider. Output
+matches Flask's provider apart from whitespace and non-ASCII characters
+being written as UTF-8 rather than ``\\u`` escapes: keys stay sorted, and
+dates still go through Flask's ``default`` (HTTP date strings).
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask's provider with orjson doing the work for default arguments."""
+
+    options = (
+        orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if orjson
+        else 0
+    )
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.options).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        options = self.options | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            options |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=options),
+            mimetype=self.mimetype,
+        )
+
+
+def provider_class(name):
+    if name == "stdlib" or (name == "auto" and orjson is None):
+        return DefaultJSONProvider
+    if name in {"auto", "orjson"}:
+        if orjson is None:
+            raise RuntimeError("JSON_ENCODER=orjson but orjson is not installed.")
+        return OrjsonProvider
+    raise ValueError(f"Unknown JSON_ENCODER {name!r}; use auto, orjson, or stdlib.")
@@ -0,0 +1,441 @@
+"""Prometheus metrics collected in-process and served at ``/metrics``.
+
+Every thread records into its own shard of plain dicts, so the request path
+never takes a lock; a scrape sums the shards. With several worker processes
+set ``METRICS_DIR`` to a directory they share: each process writes its
+totals there every ``METRICS_FLUSH_INTERVAL`` seconds (and the scraped one
+right before answering), and a scrape merges every file. Files of workers
+that exited are folded into one ``retired.json`` so counters never go
+backwards and recycled workers don't leave a file each. Connection-pool
+gauges describe the process that answered the scrape.
+"""
+
+import fcntl
+import json
+import os
+import secrets
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from flask import request
+from sqlalchemy import event
+
+from cache import department_cache, employee_id_cache
+from db import db
+from security import token_cache
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+GROUP_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+WAIT_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+
+# name -> (type, help, buckets)
+METRICS = {
+    "http_requests_total": ("counter", "Requests handled.", None),
+    "http_request_duration_seconds": (
+        "histogram", "Time from request start to response.", LATENCY_BUCKETS
+    ),
+    "http_response_size_bytes": (
+        "histogram", "Response body size (streamed bodies excluded).", SIZE_BUCKETS
+    ),
+    "http_request_db_queries": (
+        "histogram", "SQL statements issued per request.", QUERY_BUCKETS
+    ),
+    "db_pool_checkout_wait_seconds": (
+        "histogram", "Time spent waiting for a pooled connection.", WAIT_BUCKETS
+    ),
+    "db_group_commit_size": (
+        "histogram", "Writes committed together by the group-commit writer.", GROUP_BUCKETS
+    ),
+    "cache_hits_total": ("counter", "Cache lookups served from memory.", None),
+    "cache_misses_total": ("counter", "Cache lookups that had to reload.", None),
+}
+
+RETIRED_FILE = "retired.json"
+
+_request_queries = ContextVar("request_queries", default=None)
+
+
+class _Shard:
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+
+
+class Registry:
+    def __init__(self):
+        self.directory = None
+        self.flush_interval = 5.0
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # A forked worker starts from zero rather than inheriting the
+        # parent's totals, which the parent already reports itself.
+        self._local = threading.local()
+        # (thread, shard) pairs; shards of finished threads are folded into
+        # ``_retired`` so per-request threads don't pile up.
+        self._shards = []
+        self._retired = _Shard()
+        self._lock = threading.Lock()
+        self._flusher = None
+        # PIDs get reused, so files are named by a per-process unique id.
+        self._worker_id = f"{os.getpid()}-{secrets.token_hex(4)}"
+        self._cache_offsets = {
+            name: (cache.hits, cache.misses) for name, cache in self._caches()
+        }
+
+    @staticmethod
+    def _caches():
+        return (
+            ("departments", department_cache),
+            ("employee_ids", employee_id_cache),
+            ("auth_tokens", token_cache),
+        )
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._retire_finished()
+                self._shards.append((threading.current_thread(), shard))
+                if self.directory and self._flusher is None:
+                    self._start_flusher()
+        return shard
+
+    def _retire_finished(self):
+        # Called with ``_lock`` held. A finished thread never writes again, so
+        # its shard can be merged once and dropped.
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+                continue
+            retired = self._retired
+            for key, value in shard.counters.items():
+                retired.counters[key] = retired.counters.get(key, 0) + value
+            for key, (buckets, total, count) in shard.histograms.items():
+                _merge_histogram(retired.histograms, key, list(buckets), total, count)
+        self._shards = live
+
+    def inc(self, name, labels, value=1):
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        histograms = self._shard().histograms
+        key = (name, labels)
+        entry = histograms.get(key)
+        if entry is None:
+            entry = histograms[key] = [[0] * (len(METRICS[name][2]) + 1), 0.0, 0]
+        entry[0][bisect_left(METRICS[name][2], value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def snapshot(self):
+        """This process's totals as ``{"counters": ..., "histograms": ...}``."""
+        counters = {}
+        histograms = {}
+        with self._lock:
+            self._retire_finished()
+            shards = [shard for _thread, shard in self._shards]
+            shards.append(_copy_shard(self._retired))
+        for shard in shards:
+            for key, value in shard.counters.copy().items():
+                counters[key] = counters.get(key, 0) + value
+            for key, (buckets, total, count) in shard.histograms.copy().items():
+                _merge_histogram(histograms, key, list(buckets), total, count)
+        for name, cache in self._caches():
+            hits, misses = self._cache_offsets.get(name, (0, 0))
+            counters[("cache_hits_total", (("cache", name),))] = cache.hits - hits
+            counters[("cache_misses_total", (("cache", name),))] = cache.misses - misses
+        return {"counters": counters, "histograms": histograms}
+
+    def collect(self):
+        """Totals across every process sharing ``directory``."""
+        local = self.snapshot()
+        if not self.directory:
+            return local
+        self._write(local)
+        self._retire_dead_workers()
+        merged = {"counters": {}, "histograms": {}}
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            data = _read_snapshot(os.path.join(self.directory, name))
+            if data:
+                _merge_snapshot(merged, data)
+        return merged
+
+    def _write(self, snapshot, name=None):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as handle:
+            json.dump(_encode(snapshot), handle)
+        os.replace(path, os.path.join(self.directory, name or f"{self._worker_id}.json"))
+
+    def _retire_dead_workers(self):
+        """Fold the files of exited workers into ``retired.json``.
+
+        Recycled workers would otherwise leave one file each behind forever.
+        The directory lock keeps two scrapes from merging the same file.
+        """
+        with open(os.path.join(self.directory, ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            dead = [
+                name
+                for name in os.listdir(self.directory)
+                if name.endswith(".json")
+                and name != RETIRED_FILE
+                and not _pid_alive(name.split("-", 1)[0])
+            ]
+            if not dead:
+                return
+            retired = _read_snapshot(os.path.join(self.directory, RETIRED_FILE))
+            retired = retired or {"counters": {}, "histograms": {}}
+            for name in dead:
+                data = _read_snapshot(os.path.join(self.directory, name))
+                if data:
+                    _merge_snapshot(retired, data)
+            self._write(retired, RETIRED_FILE)
+            for name in dead:
+                os.remove(os.path.join(self.directory, name))
+
+    def _start_flusher(self):
+        def flush():
+            while True:
+                time.sleep(self.flush_interval)
+                try:
+                    self._write(self.snapshot())
+                except OSError:
+                    pass
+
+        self._flusher = threading.Thread(target=flush, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(int(pid), 0)
+    except ValueError:
+        return True  # not a worker file we know how to judge
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _read_snapshot(path):
+    try:
+        with open(path) as handle:
+            return _decode(json.load(handle))
+    except (OSError, ValueError):
+        return None
+
+
+def _merge_snapshot(merged, data):
+    for key, value in data["counters"].items():
+        merged["counters"][key] = merged["counters"].get(key, 0) + value
+    for key, (buckets, total, count) in data["histograms"].items():
+        _merge_histogram(merged["histograms"], key, list(buckets), total, count)
+
+
+def _copy_shard(shard):
+    copy = _Shard()
+    copy.counters = dict(shard.counters)
+    copy.histograms = {
+        key: [list(buckets), total, count]
+        for key, (buckets, total, count) in shard.histograms.items()
+    }
+    return copy
+
+
+def _merge_histogram(histograms, key, buckets, total, count):
+    entry = histograms.get(key)
+    if entry is None:
+        histograms[key] = [buckets, total, count]
+        return
+    entry[0] = [a + b for a, b in zip(entry[0], buckets)]
+    entry[1] += total
+    entry[2] += count
+
+
+def _encode(snapshot):
+    # JSON has no tuples, so ``(name, labels) -> value`` becomes a list.
+    return {
+        kind: [[name, labels, value] for (name, labels), value in values.items()]
+        for kind, values in snapshot.items()
+    }
+
+
+def _decode(data):
+    return {
+        kind: {
+            (name, tuple(tuple(label) for label in labels)): value
+            for name, labels, value in values
+        }
+        for kind, values in data.items()
+    }
+
+
+registry = Registry()
+
+
+def render(snapshot, gauges=()):
+    """Prometheus text exposition of ``snapshot`` plus ``(name, help, value)`` gauges."""
+    by_name = {}
+    for (name, labels), value in snapshot["counters"].items():
+        by_name.setdefault(name, []).append((labels, value))
+    for (name, labels), value in snapshot["histograms"].items():
+        by_name.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, (kind, help_text, bounds) in METRICS.items():
+        series = sorted(by_name.get(name, ()))
+        if not series:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in series:
+            if kind == "counter":
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                continue
+            buckets, total, count = value
+            cumulative = 0
+            for bound, bucket in zip((*bounds, "+Inf"), buckets):
+                cumulative += bucket
+                le = bound if bound == "+Inf" else _number(bound)
+                lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+
+    for name, help_text, value in gauges:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def init_metrics(app):
+    config = app.config
+    if not config["METRICS_ENABLED"]:
+        return
+
+    registry.directory = config["METRICS_DIR"]
+    registry.flush_interval = config["METRICS_FLUSH_INTERVAL"]
+    with app.app_context():
+        engine = db.engine
+    _instrument_pool(engine)
+    event.listen(engine, "engine_disposed", _instrument_pool)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def count_query(*_args):
+        counter = _request_queries.get()
+        if counter is not None:
+            counter[0] += 1
+
+    @app.before_request
+    def start_timer():
+        # Kept on the request rather than ``g``: sub-requests dispatched by
+        # ``/batch`` share the outer request's app context.
+        request.environ["hr.metrics_started"] = time.perf_counter()
+        request.environ["hr.metrics_token"] = _request_queries.set([0])
+
+    @app.after_request
+    def record_request(response):
+        started = request.environ.get("hr.metrics_started")
+        if started is None or request.endpoint == "metrics":
+            return response
+        endpoint = request.endpoint or "unmatched"
+        labels = (("endpoint", endpoint), ("method", request.method))
+        registry.inc(
+            "http_requests_total",
+            (
+                ("blueprint", request.blueprint or ""),
+                *labels,
+                ("status", str(response.status_code)),
+            ),
+        )
+        registry.observe(
+            "http_request_duration_seconds", labels, time.perf_counter() - started
+        )
+        if not response.is_streamed:
+            registry.observe(
+                "http_response_size_bytes", labels, response.calculate_content_length() or 0
+            )
+        queries = _request_queries.get()
+        if queries is not None:
+            registry.observe("http_request_db_queries", labels, queries[0])
+        return response
+
+    @app.teardown_request
+    def stop_counting(_error):
+        token = request.environ.pop("hr.metrics_token", None)
+        if token is not None:
+            _request_queries.reset(token)
+
+    @app.get("/metrics")
+    def metrics():
+        pool = engine.pool
+        gauges = []
+        if hasattr(pool, "checkedout"):
+            gauges = [
+                (
+                    "db_pool_checked_out",
+                    "Connections in use in this process.",
+                    pool.checkedout(),
+                ),
+                (
+                    "db_pool_idle",
+                    "Idle pooled connections in this process.",
+                    pool.checkedin(),
+                ),
+                (
+                    "db_pool_overflow",
+                    "Connections open beyond pool_size in this process.",
+                    max(pool.overflow(), 0),
+                ),
+            ]
+        return app.response_class(
+            render(registry.collect(), gauges),
+            mimetype="text/plain; version=0.0.4",
+        )
+
+
+def _instrument_pool(engine):
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            registry.observe(
+                "db_pool_checkout_wait_seconds", (), time.perf_counter() - started
+            )
+
+    pool.connect = timed_connect
@@ -0,0 +1,194 @@
+"""Versioned, in-place schema migrations for the SQLite database.
+
+The schema version lives in SQLite's ``PRAGMA user_version`` so checking it
+costs a single pragma read. A brand-new database is built from the models
+with ``db.create_all()`` and stamped at the head version; an existing
+database gets every pending migration applied in order. Migration
+statements are SQL strings or callables taking the connection, and must be
+idempotent (``IF NOT EXISTS`` and friends) so a run that was interrupted part
+way can simply be repeated.
+"""
+
+from sqlalchemy import inspect
+
+from db import db
+
+
+def _add_column(table, column, definition):
+    """``ALTER TABLE ADD COLUMN`` that is a no-op when the column exists."""
+
+    def apply(connection):
+        columns = {info["name"] for info in inspect(connection).get_columns(table)}
+        if column not in columns:
+            connection.exec_driver_sql(
+                f"ALTER TABLE {table} ADD COLUMN {column} {definition}"
+            )
+
+    return apply
+
+
+MIGRATIONS = [
+    (
+        1,
+        "Add lookup indexes for attendance and leave queries",
+        [
+            "CREATE INDEX IF NOT EXISTS ix_attendance_records_employee_check_in "
+            "ON attendance_records (employee_id, check_in)",
+            "CREATE INDEX IF NOT EXISTS ix_attendance_records_open "
+            "ON attendance_records (employee_id, check_in) WHERE check_out IS NULL",
+            "CREATE INDEX IF NOT EXISTS ix_leave_requests_employee_start "
+            "ON leave_requests (employee_id, start_date)",
+            "CREATE INDEX IF NOT EXISTS ix_leave_requests_status "
+            "ON leave_requests (status)",
+            "CREATE INDEX IF NOT EXISTS ix_leave_requests_dates "
+            "ON leave_requests (start_date, end_date)",
+        ],
+    ),
+    (
+        2,
+        "Allow at most one open attendance record per employee",
+        [
+            # Older racing check-ins may have left several open records; close
+            # all but the most recent one as zero-length sessions.
+            "UPDATE attendance_records SET check_out = check_in "
+            "WHERE check_out IS NULL AND EXISTS ("
+            "SELECT 1 FROM attendance_records AS newer "
+            "WHERE newer.employee_id = attendance_records.employee_id "
+            "AND newer.check_out IS NULL "
+            "AND (newer.check_in > attendance_records.check_in "
+            "OR (newer.check_in = attendance_records.check_in "
+            "AND newer.id > attendance_records.id)))",
+            "DROP INDEX IF EXISTS ix_attendance_records_open",
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_attendance_records_open "
+            "ON attendance_records (employee_id) WHERE check_out IS NULL",
+        ],
+    ),
+    (
+        3,
+        "Index attendance by check-in time for date-ranged exports",
+        [
+            "CREATE INDEX IF NOT EXISTS ix_attendance_records_check_in "
+            "ON attendance_records (check_in)",
+        ],
+    ),
+    (
+        4,
+        "Add the daily attendance rollup and backfill it",
+        [
+            "CREATE TABLE IF NOT EXISTS attendance_daily_rollups ("
+            "employee_id INTEGER NOT NULL, "
+            "day DATE NOT NULL, "
+            "worked_seconds INTEGER NOT NULL, "
+            "sessions INTEGER NOT NULL, "
+            "first_in DATETIME NOT NULL, "
+            "last_out DATETIME NOT NULL, "
+            "PRIMARY KEY (employee_id, day), "
+            "FOREIGN KEY(employee_id) REFERENCES employees (id))",
+            "CREATE INDEX IF NOT EXISTS ix_attendance_daily_rollups_day "
+            "ON attendance_daily_rollups (day)",
+            "DELETE FROM attendance_daily_rollups",
+            "INSERT INTO attendance_daily_rollups "
+            "(employee_id, day, worked_seconds, sessions, first_in, last_out) "
+            "SELECT employee_id, date(check_in), "
+            "SUM(CAST(round((julianday(check_out) - julianday(check_in)) * 86400) "
+            "AS INTEGER)), COUNT(*), MIN(check_in), MAX(check_out) "
+            "FROM attendance_records WHERE check_out IS NOT NULL "
+            "GROUP BY employee_id, date(check_in)",
+        ],
+    ),
+    (
+        5,
+        "Index leave filters by department and by status plus start date",
+        [
+            "CREATE INDEX IF NOT EXISTS ix_employees_department_id "
+            "ON employees (department_id)",
+            "DROP INDEX IF EXISTS ix_leave_requests_status",
+            "CREATE INDEX IF NOT EXISTS ix_leave_requests_status_start "
+            "ON leave_requests (status, start_date)",
+        ],
+    ),
+    (
+        6,
+        "Cover per-employee leave intervals for overlap checks",
+        [
+            "DROP INDEX IF EXISTS ix_leave_requests_employee_start",
+            "CREATE INDEX IF NOT EXISTS ix_leave_requests_employee_interval "
+            "ON leave_requests (employee_id, start_date, end_date, status)",
+        ],
+    ),
+    (
+        7,
+        "Record which balance bucket a leave request draws from",
+        [
+            _add_column(
+                "leave_requests",
+                "leave_type",
+                "VARCHAR(20) DEFAULT 'vacation' NOT NULL",
+            ),
+        ],
+    ),
+]
+
+HEAD_VERSION = MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def current_version(connection):
+    return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def pending_migrations(connection):
+    version = current_version(connection)
+    return [migration for migration in MIGRATIONS if migration[0] > version]
+
+
+def _stamp(connection, version):
+    connection.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+
+
+def upgrade(engine=None):
+    """Bring the database to ``HEAD_VERSION``; returns the versions applied."""
+    engine = engine or db.engine
+    with engine.begin() as connection:
+        if not inspect(connection).has_table("employees"):
+            db.metadata.create_all(connection)
+            _stamp(connection, HEAD_VERSION)
+            return []
+
+    applied = []
+    with engine.connect() as connection:
+        migrations = pending_migrations(connection)
+    for version, _description, statements in migrations:
+        with engine.begin() as connection:
+            for statement in statements:
+                if callable(statement):
+                    statement(connection)
+                else:
+                    connection.exec_driver_sql(statement)
+            _stamp(connection, version)
+        applied.append(version)
+    return applied
+
+
+def ensure_schema(auto_upgrade=True, engine=None):
+    """Startup check: upgrade in place, or refuse to run on an old schema.
+
+    A database already at the head version costs one pragma read either way.
+    """
+    engine = engine or db.engine
+    with engine.connect() as connection:
+        version = current_version(connection)
+        if version >= HEAD_VERSION:
+            return []
+        if not auto_upgrade and not inspect(connection).has_table("employees"):
+            raise SchemaOutOfDate("Database is empty; run `flask init-db`.")
+
+    if auto_upgrade:
+        return upgrade(engine)
+    raise SchemaOutOfDate(
+        f"Database schema is at version {version}, expected {HEAD_VERSION}; "
+        "run `flask db upgrade`."
+    )
@@ -0,0 +1,81 @@
+"""``EXPLAIN QUERY PLAN`` report for the queries behind the busiest endpoints."""
+
+from db import db
+
+HOT_QUERIES = {
+    "employees.keyset_page": (
+        "SELECT * FROM employees WHERE id > :after ORDER BY id LIMIT :limit",
+        {"after": 0, "limit": 100},
+    ),
+    "auth.login": (
+        "SELECT * FROM employees WHERE email = :email",
+        {"email": "someone@example.com"},
+    ),
+    "attendance.open_record": (
+        "SELECT id FROM attendance_records "
+        "WHERE employee_id = :employee_id AND check_out IS NULL",
+        {"employee_id": 1},
+    ),
+    "attendance.by_employee": (
+        "SELECT * FROM attendance_records WHERE employee_id = :employee_id",
+        {"employee_id": 1},
+    ),
+    "attendance.export_month": (
+        "SELECT * FROM attendance_records "
+        "WHERE check_in >= :start AND check_in < :end ORDER BY check_in, id",
+        {"start": "2025-01-01 00:00:00", "end": "2025-02-01 00:00:00"},
+    ),
+    "leaves.by_employee": (
+        "SELECT * FROM leave_requests WHERE employee_id = :employee_id",
+        {"employee_id": 1},
+    ),
+    "leaves.overlap_probe": (
+        "SELECT id, start_date, end_date FROM leave_requests "
+        "WHERE employee_id = :employee_id "
+        "AND status IN ('pending', 'approved') AND start_date <= :end_date "
+        "ORDER BY start_date DESC LIMIT 1",
+        {"employee_id": 1, "end_date": "2025-01-31"},
+    ),
+    "leaves.by_status": (
+        "SELECT * FROM leave_requests WHERE status = :status",
+        {"status": "pending"},
+    ),
+    "leaves.date_overlap": (
+        "SELECT * FROM leave_requests "
+        "WHERE start_date <= :to_date AND end_date >= :from_date",
+        {"from_date": "2025-01-01", "to_date": "2025-01-31"},
+    ),
+    "leaves.calendar": (
+        "SELECT leave_requests.id, employees.first_name FROM leave_requests "
+        "JOIN employees ON employees.id = leave_requests.employee_id "
+        "WHERE leave_requests.status = :status "
+        "AND leave_requests.start_date <= :to_date "
+        "AND leave_requests.end_date >= :from_date "
+        "AND employees.department_id = :department_id",
+        {
+            "status": "approved",
+            "from_date": "2025-01-01",
+            "to_date": "2025-01-31",
+            "department_id": 1,
+        },
+    ),
+}
+
+
+def explain(connection, sql, params):
+    # exec_driver_sql hands the string to sqlite3 untouched, and sqlite3
+    # understands ``:name`` placeholders natively.
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params)
+    return [row[-1] for row in rows]
+
+
+def plan_report(engine=None):
+    """Return ``[(name, plan_lines, scans)]`` where ``scans`` flags table scans."""
+    engine = engine or db.engine
+    report = []
+    with engine.connect() as connection:
+        for name, (sql, params) in HOT_QUERIES.items():
+            plan = explain(connection, sql, params)
+            scans = [line for line in plan if line.startswith("SCAN")]
+            report.append((name, plan, scans))
+    return report
@@ -1,6 +1,52 @@
 from datetime import date, datetime
+from operator import attrgetter
 
+from sqlalchemy.orm import load_only, selectinload
+
+from cache import department_cache
 from db import db
+from models.serialization import compile_row_serializer
+
+
+def _isoformat(name):
+    getter = attrgetter(name)
+
+    def serialize(obj):
+        value = getter(obj)
+        return value.isoformat() if value else None
+
+    return serialize
+
+
+def _leave_bucket(total, used):
+    remaining = max(total - used, 0)
+    return {
+        "total": total,
+        "used": used,
+        "remaining": remaining,
+        "eligible": remaining > 0,
+    }
+
+
+def _leave_balances(
+    gender,
+    sick_total,
+    sick_used,
+    vacation_total,
+    vacation_used,
+    maternity_total,
+    maternity_used,
+):
+    is_female = gender == "female"
+    maternity = _leave_bucket(
+        maternity_total if is_female else 0, maternity_used if is_female else 0
+    )
+    maternity["eligible"] = is_female and maternity["remaining"] > 0
+    return {
+        "sick": _leave_bucket(sick_total, sick_used),
+        "vacation": _leave_bucket(vacation_total, vacation_used),
+        "maternity": maternity,
+    }
 
 
 class TimestampMixin:
@@ -10,7 +56,64 @@ class TimestampMixin:
     )
 
 
-class Department(db.Model, TimestampMixin):
+class SerializerMixin:
+    """Field-table serialization shared by all models.
+
+    ``SERIALIZERS`` maps each output field to a callable taking the instance.
+    ``FIELD_COLUMNS`` lists the columns a computed field reads (plain columns
+    map to themselves) and ``FIELD_RELATIONSHIPS`` names the relationship a
+    nested field needs, plus the related columns it reads (``None`` for all).
+    ``FIELD_BUILDERS`` computes a non-relationship field from its
+    ``FIELD_COLUMNS`` values, so it can be served from plain result rows.
+    """
+
+    SERIALIZERS = {}
+    COMPACT_FIELDS = ()
+    FIELD_COLUMNS = {}
+    FIELD_RELATIONSHIPS = {}
+    FIELD_BUILDERS = {}
+
+    def to_dict(self, fields=None):
+        return self.serialize(self, fields)
+
+    @classmethod
+    def serialize(cls, row, fields=None):
+        """Serialize an instance or any row exposing the columns as attributes."""
+        serializers = cls.SERIALIZERS
+        if fields is None:
+            return {name: serialize(row) for name, serialize in serializers.items()}
+        return {name: serializers[name](row) for name in fields}
+
+    @classmethod
+    def load_options(cls, fields=None):
+        """Loader options that fetch exactly what ``to_dict(fields)`` reads."""
+        names = cls.SERIALIZERS if fields is None else fields
+        columns = set()
+        options = []
+        for name in names:
+            columns.update(cls.FIELD_COLUMNS.get(name, (name,)))
+            if name not in cls.FIELD_RELATIONSHIPS:
+                continue
+            relationship, related_columns = cls.FIELD_RELATIONSHIPS[name]
+            attribute = getattr(cls, relationship)
+            loader = selectinload(attribute)
+            if related_columns:
+                target = attribute.property.mapper.class_
+                loader = loader.load_only(
+                    *(getattr(target, column) for column in related_columns)
+                )
+            options.append(loader)
+        if fields is not None:
+            options.append(load_only(*(getattr(cls, column) for column in columns)))
+        return options
+
+    @classmethod
+    def row_serializer(cls, fields=None):
+        """Compiled :class:`~models.serialization.RowSerializer` for ``fields``."""
+        return compile_row_serializer(cls, fields)
+
+
+class Department(db.Model, TimestampMixin, SerializerMixin):
     __tablename__ = "departments"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -19,17 +122,17 @@ class Department(db.Model, TimestampMixin):
 
     employees = db.relationship("Employee", back_populates="department", lazy=True)
 
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "name": self.name,
-            "description": self.description,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
+    SERIALIZERS = {
+        "id": attrgetter("id"),
+        "name": attrgetter("name"),
+        "description": attrgetter("description"),
+        "created_at": _isoformat("created_at"),
+        "updated_at": _isoformat("updated_at"),
+    }
+    COMPACT_FIELDS = ("id", "name")
 
 
-class Employee(db.Model, TimestampMixin):
+class Employee(db.Model, TimestampMixin, SerializerMixin):
     __tablename__ = "employees"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -38,7 +141,7 @@ class Employee(db.Model, TimestampMixin):
     email = db.Column(db.String(255), unique=True, nullable=False)
     role = db.Column(db.String(120))
     gender = db.Column(db.String(20), nullable=False, default="unspecified")
-    password = db.Column(db.String(128), nullable=False)
+    password = db.Column(db.String(255), nullable=False)
     department_id = db.Column(db.Integer, db.ForeignKey("departments.id"), nullable=False)
     hire_date = db.Column(db.Date, nullable=False, default=date.today)
     sick_leave_total = db.Column(db.Integer, nullable=False, default=10)
@@ -48,54 +151,51 @@ class Employee(db.Model, TimestampMixin):
     maternity_leave_total = db.Column(db.Integer, nullable=False, default=0)
     maternity_leave_used = db.Column(db.Integer, nullable=False, default=0)
 
+    __table_args__ = (db.Index("ix_employees_department_id", "department_id"),)
+
     department = db.relationship("Department", back_populates="employees")
     attendances = db.relationship("AttendanceRecord", back_populates="employee", lazy=True)
     leaves = db.relationship("LeaveRequest", back_populates="employee", lazy=True)
 
-    def _build_leave_bucket(self, total, used):
-        remaining = max(total - used, 0)
-        return {
-            "total": total,
-            "used": used,
-            "remaining": remaining,
-            "eligible": remaining > 0,
-        }
-
     def leave_balances(self):
-        sick = self._build_leave_bucket(self.sick_leave_total, self.sick_leave_used)
-        vacation = self._build_leave_bucket(
-            self.vacation_leave_total, self.vacation_leave_used
-        )
-        maternity_total = self.maternity_leave_total if self.gender == "female" else 0
-        maternity_used = (
-            self.maternity_leave_used if self.gender == "female" else 0
+        return _leave_balances(
+            *(getattr(self, column) for column in self.FIELD_COLUMNS["leave_balances"])
         )
-        maternity = self._build_leave_bucket(maternity_total, maternity_used)
-        maternity["eligible"] = self.gender == "female" and maternity["remaining"] > 0
 
-        return {
-            "sick": sick,
-            "vacation": vacation,
-            "maternity": maternity,
-        }
-
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "first_name": self.first_name,
-            "last_name": self.last_name,
-            "email": self.email,
-            "role": self.role,
-            "gender": self.gender,
-            "department": self.department.to_dict() if self.department else None,
-            "hire_date": self.hire_date.isoformat() if self.hire_date else None,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-            "leave_balances": self.leave_balances(),
-        }
+    SERIALIZERS = {
+        "id": attrgetter("id"),
+        "first_name": attrgetter("first_name"),
+        "last_name": attrgetter("last_name"),
+        "email": attrgetter("email"),
+        "role": attrgetter("role"),
+        "gender": attrgetter("gender"),
+        "department": lambda emp: department_cache.get(emp.department_id),
+        "hire_date": _isoformat("hire_date"),
+        "created_at": _isoformat("created_at"),
+        "updated_at": _isoformat("updated_at"),
+        "leave_balances": lambda emp: emp.leave_balances(),
+    }
+    COMPACT_FIELDS = ("id", "first_name", "last_name", "email", "role")
+    FIELD_COLUMNS = {
+        "department": ("department_id",),
+        "leave_balances": (
+            "gender",
+            "sick_leave_total",
+            "sick_leave_used",
+            "vacation_leave_total",
+            "vacation_leave_used",
+            "maternity_leave_total",
+            "maternity_leave_used",
+        ),
+    }
+    # Departments are embedded from the in-process cache, never joined.
+    FIELD_BUILDERS = {
+        "department": department_cache.get,
+        "leave_balances": _leave_balances,
+    }
 
 
-class AttendanceRecord(db.Model, TimestampMixin):
+class AttendanceRecord(db.Model, TimestampMixin, SerializerMixin):
     __tablename__ = "attendance_records"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -103,20 +203,31 @@ class AttendanceRecord(db.Model, TimestampMixin):
     check_in = db.Column(db.DateTime, nullable=False)
     check_out = db.Column(db.DateTime)
 
+    __table_args__ = (
+        db.Index("ix_attendance_records_employee_check_in", "employee_id", "check_in"),
+        db.Index("ix_attendance_records_check_in", "check_in"),
+        db.Index(
+            "uq_attendance_records_open",
+            "employee_id",
+            unique=True,
+            sqlite_where=db.text("check_out IS NULL"),
+        ),
+    )
+
     employee = db.relationship("Employee", back_populates="attendances")
 
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "employee_id": self.employee_id,
-            "check_in": self.check_in.isoformat() if self.check_in else None,
-            "check_out": self.check_out.isoformat() if self.check_out else None,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
+    SERIALIZERS = {
+        "id": attrgetter("id"),
+        "employee_id": attrgetter("employee_id"),
+        "check_in": _isoformat("check_in"),
+        "check_out": _isoformat("check_out"),
+        "created_at": _isoformat("created_at"),
+        "updated_at": _isoformat("updated_at"),
+    }
+    COMPACT_FIELDS = ("id", "employee_id", "check_in", "check_out")
 
 
-class LeaveRequest(db.Model, TimestampMixin):
+class LeaveRequest(db.Model, TimestampMixin, SerializerMixin):
     __tablename__ = "leave_requests"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -125,25 +236,69 @@ class LeaveRequest(db.Model, TimestampMixin):
     end_date = db.Column(db.Date, nullable=False)
     reason = db.Column(db.String(255))
     status = db.Column(db.String(50), nullable=False, default="pending")
+    leave_type = db.Column(
+        db.String(20), nullable=False, default="vacation", server_default="vacation"
+    )
+
+    __table_args__ = (
+        db.Index(
+            "ix_leave_requests_employee_interval",
+            "employee_id",
+            "start_date",
+            "end_date",
+            "status",
+        ),
+        db.Index("ix_leave_requests_status_start", "status", "start_date"),
+        db.Index("ix_leave_requests_dates", "start_date", "end_date"),
+    )
 
     employee = db.relationship("Employee", back_populates="leaves")
 
-    def to_dict(self):
+    def _employee_summary(self):
+        if not self.employee:
+            return None
         return {
-            "id": self.id,
-            "employee_id": self.employee_id,
-            "start_date": self.start_date.isoformat() if self.start_date else None,
-            "end_date": self.end_date.isoformat() if self.end_date else None,
-            "reason": self.reason,
-            "status": self.status,
-            "employee": {
-                "id": self.employee.id,
-                "first_name": self.employee.first_name,
-                "last_name": self.employee.last_name,
-            }
-            if self.employee
-            else None,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "id": self.employee.id,
+            "first_name": self.employee.first_name,
+            "last_name": self.employee.last_name,
         }
 
+    SERIALIZERS = {
+        "id": attrgetter("id"),
+        "employee_id": attrgetter("employee_id"),
+        "start_date": _isoformat("start_date"),
+        "end_date": _isoformat("end_date"),
+        "reason": attrgetter("reason"),
+        "status": attrgetter("status"),
+        "leave_type": attrgetter("leave_type"),
+        "employee": _employee_summary,
+        "created_at": _isoformat("created_at"),
+        "updated_at": _isoformat("updated_at"),
+    }
+    COMPACT_FIELDS = (
+        "id",
+        "employee_id",
+        "start_date",
+        "end_date",
+        "status",
+        "leave_type",
+    )
+    FIELD_COLUMNS = {"employee": ("employee_id",)}
+    FIELD_RELATIONSHIPS = {"employee": ("employee", ("first_name", "last_name"))}
+
+
+class AttendanceDailyRollup(db.Model):
+    """Completed attendance sessions summed per employee and check-in day."""
+
+    __tablename__ = "attendance_daily_rollups"
+
+    employee_id = db.Column(
+        db.Integer, db.ForeignKey("employees.id"), primary_key=True
+    )
+    day = db.Column(db.Date, primary_key=True)
+    worked_seconds = db.Column(db.Integer, nullable=False, default=0)
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    first_in = db.Column(db.DateTime, nullable=False)
+    last_out = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (db.Index("ix_attendance_daily_rollups_day", "day"),)
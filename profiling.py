@@ -0,0 +1,197 @@
+"""Opt-in per-request profiling.
+
+With ``PROFILING`` off, ``init_profiling`` registers nothing, so requests pay
+nothing. With it on, every request gets:
+
+- SQL statement count and time from engine cursor events, JSON encoding
+  time from the app's JSON provider, and the remaining handler time,
+  reported with the total in a ``Server-Timing`` header;
+- a warning log for requests slower than ``PROFILE_SLOW_REQUEST_MS`` and for
+  statements slower than ``PROFILE_SLOW_QUERY_MS``, the latter with their
+  ``EXPLAIN QUERY PLAN`` on SQLite;
+- optionally, a cProfile sample of ``PROFILE_ROUTE`` (an endpoint name such
+  as ``api.employees.list_employees`` or a rule such as ``/employees``) for
+  ``PROFILE_SAMPLE_RATE`` of its requests, written to ``PROFILE_DIR`` as a
+  ``.prof`` file or logged as the top functions by cumulative time.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import random
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from flask import request
+from sqlalchemy import event
+
+from db import db
+from migrations.explain import explain
+
+_current = ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    __slots__ = (
+        "started",
+        "sql_count",
+        "sql_time",
+        "json_time",
+        "in_json",
+        "slow_queries",
+        "profiler",
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.json_time = 0.0
+        self.in_json = False
+        self.slow_queries = []
+        self.profiler = None
+
+
+def init_profiling(app):
+    config = app.config
+    if not config["PROFILING"]:
+        return
+
+    slow_request = config["PROFILE_SLOW_REQUEST_MS"] / 1000
+    slow_query = config["PROFILE_SLOW_QUERY_MS"] / 1000
+    route = config["PROFILE_ROUTE"]
+    sample_rate = config["PROFILE_SAMPLE_RATE"]
+    profile_dir = config["PROFILE_DIR"]
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            context._profile_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def end_statement(conn, cursor, statement, parameters, context, executemany):
+        profile = _current.get()
+        if profile is None or not hasattr(context, "_profile_started"):
+            return
+        elapsed = time.perf_counter() - context._profile_started
+        profile.sql_count += 1
+        profile.sql_time += elapsed
+        if elapsed >= slow_query:
+            explainable = not executemany and engine.dialect.name == "sqlite"
+            profile.slow_queries.append(
+                (elapsed, statement, parameters if explainable else None, explainable)
+            )
+
+    _time_json(app)
+
+    @app.before_request
+    def start_profile():
+        profile = RequestProfile()
+        request.environ["hr.profile_token"] = _current.set(profile)
+        if route and route in (request.endpoint, request.url_rule and request.url_rule.rule):
+            if random.random() < sample_rate:
+                profile.profiler = cProfile.Profile()
+                try:
+                    profile.profiler.enable()
+                except ValueError:
+                    # Another profiler is already running in this process.
+                    profile.profiler = None
+
+    @app.after_request
+    def finish_profile(response):
+        profile = _current.get()
+        if profile is None:
+            return response
+        total = time.perf_counter() - profile.started
+        if profile.profiler is not None:
+            profile.profiler.disable()
+            _report_profile(app, profile.profiler, profile_dir)
+
+        handler = total - profile.sql_time - profile.json_time
+        response.headers["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={profile.sql_time * 1000:.2f};desc="{profile.sql_count} queries"',
+                f"json;dur={profile.json_time * 1000:.2f}",
+                f"app;dur={handler * 1000:.2f}",
+                f"total;dur={total * 1000:.2f}",
+            ]
+        )
+        if total >= slow_request:
+            app.logger.warning(
+                "Slow request %s %s: %.1f ms, %d queries in %.1f ms, json %.1f ms",
+                request.method,
+                request.full_path,
+                total * 1000,
+                profile.sql_count,
+                profile.sql_time * 1000,
+                profile.json_time * 1000,
+            )
+        for elapsed, statement, parameters, explainable in list(profile.slow_queries):
+            plan = _explain(engine, statement, parameters) if explainable else []
+            app.logger.warning(
+                "Slow query (%.1f ms) during %s %s: %s\n%s",
+                elapsed * 1000,
+                request.method,
+                request.path,
+                statement,
+                "\n".join(f"    {line}" for line in plan),
+            )
+        return response
+
+    @app.teardown_request
+    def clear_profile(_error):
+        token = request.environ.pop("hr.profile_token", None)
+        if token is not None:
+            _current.reset(token)
+
+
+def _time_json(app):
+    """Count time spent in the JSON provider towards the current request."""
+    provider = app.json
+
+    def timed(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            profile = _current.get()
+            if profile is None or profile.in_json:
+                return method(*args, **kwargs)
+            profile.in_json = True
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                profile.json_time += time.perf_counter() - started
+                profile.in_json = False
+
+        return wrapper
+
+    provider.dumps = timed(provider.dumps)
+    provider.response = timed(provider.response)
+
+
+def _explain(engine, statement, parameters):
+    # Detach the request's profile so the EXPLAIN itself isn't recorded as a
+    # (slow) query of the request and explained in turn.
+    token = _current.set(None)
+    try:
+        with engine.connect() as connection:
+            return explain(connection, statement, parameters or ())
+    except Exception as exc:  # the plan is best effort; never fail the request
+        return [f"EXPLAIN failed: {exc}"]
+    finally:
+        _current.reset(token)
+
+
+def _report_profile(app, profiler, profile_dir):
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+        name = f"{request.endpoint}-{time.time_ns()}.prof"
+        profiler.dump_stats(os.path.join(profile_dir, name))
+        return
+    buffer = io.StringIO()
+    pstats.Stats(profiler, stream=buffer).sort_stats("cumulative").print_stats(25)
+    app.logger.info("Profile of %s %s\n%s", request.method, request.path, buffer.getvalue())
@@ -0,0 +1,128 @@
+"""Incrementally maintained daily attendance totals.
+
+A session is counted once it has a check-out, against the day it checked in
+on. Every code path that closes a session calls ``record_sessions`` in the
+same transaction; ``rebuild`` recomputes the table from raw attendance.
+"""
+
+from sqlalchemy import case, func, literal_column, select, text, type_coerce
+from sqlalchemy.dialects.sqlite import insert
+
+from db import db
+from models import AttendanceDailyRollup, Employee
+
+GRANULARITIES = {"day", "week", "month"}
+
+REBUILD_SQL = """
+INSERT INTO attendance_daily_rollups
+    (employee_id, day, worked_seconds, sessions, first_in, last_out)
+SELECT employee_id,
+       date(check_in),
+       SUM(CAST(round((julianday(check_out) - julianday(check_in)) * 86400) AS INTEGER)),
+       COUNT(*),
+       MIN(check_in),
+       MAX(check_out)
+FROM attendance_records
+WHERE check_out IS NOT NULL
+GROUP BY employee_id, date(check_in)
+"""
+
+
+def record_sessions(session, sessions):
+    """Fold ``(employee_id, check_in, check_out)`` sessions into the rollup."""
+    rows = [
+        {
+            "employee_id": employee_id,
+            "day": checked_in.date(),
+            "worked_seconds": round((checked_out - checked_in).total_seconds()),
+            "sessions": 1,
+            "first_in": checked_in,
+            "last_out": checked_out,
+        }
+        for employee_id, checked_in, checked_out in sessions
+    ]
+    if not rows:
+        return
+
+    table = AttendanceDailyRollup.__table__
+    statement = insert(table)
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.employee_id, table.c.day],
+        set_={
+            "worked_seconds": table.c.worked_seconds + excluded.worked_seconds,
+            "sessions": table.c.sessions + excluded.sessions,
+            "first_in": case(
+                (excluded.first_in < table.c.first_in, excluded.first_in),
+                else_=table.c.first_in,
+            ),
+            "last_out": case(
+                (excluded.last_out > table.c.last_out, excluded.last_out),
+                else_=table.c.last_out,
+            ),
+        },
+    )
+    session.execute(statement, rows)
+
+
+def rebuild(session=None):
+    session = session or db.session
+    session.execute(text("DELETE FROM attendance_daily_rollups"))
+    session.execute(text(REBUILD_SQL))
+    session.commit()
+    return session.query(func.count()).select_from(AttendanceDailyRollup).scalar()
+
+
+def _period(granularity):
+    day = AttendanceDailyRollup.day
+    if granularity == "week":
+        expression = func.date(day, "weekday 0", "-6 days")
+    elif granularity == "month":
+        expression = func.strftime("%Y-%m-01", day)
+    else:
+        return day
+    return type_coerce(expression, db.Date)
+
+
+def summarize(
+    granularity, start_day=None, end_day=None, employee_id=None, department_id=None
+):
+    """Per-period totals straight from the rollup, for one employee or a department."""
+    rollup = AttendanceDailyRollup
+    period = _period(granularity).label("period")
+    statement = select(
+        period,
+        func.sum(rollup.worked_seconds).label("worked_seconds"),
+        func.sum(rollup.sessions).label("sessions"),
+        func.count().label("days_worked"),
+        func.count(rollup.employee_id.distinct()).label("employees"),
+        func.min(rollup.first_in).label("first_in"),
+        func.max(rollup.last_out).label("last_out"),
+    )
+    if employee_id is not None:
+        statement = statement.where(rollup.employee_id == employee_id)
+    if department_id is not None:
+        statement = statement.join(Employee, Employee.id == rollup.employee_id).where(
+            Employee.department_id == department_id
+        )
+    if start_day is not None:
+        statement = statement.where(rollup.day >= start_day)
+    if end_day is not None:
+        statement = statement.where(rollup.day < end_day)
+    statement = statement.group_by(literal_column("period")).order_by(
+        literal_column("period")
+    )
+
+    return [
+        {
+            "period_start": row.period.isoformat(),
+            "worked_seconds": row.worked_seconds,
+            "worked_hours": round(row.worked_seconds / 3600, 2),
+            "sessions": row.sessions,
+            "days_worked": row.days_worked,
+            "employees": row.employees,
+            "first_in": row.first_in.isoformat(),
+            "last_out": row.last_out.isoformat(),
+        }
+        for row in db.session.execute(statement)
+    ]
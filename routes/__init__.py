@@ -2,6 +2,7 @@ from flask import Blueprint
 
 from routes.attendance import attendance_bp
 from routes.auth import auth_bp
+from routes.batch import batch_bp
 from routes.departments import departments_bp
 from routes.employees import employees_bp
 from routes.leaves import leaves_bp
@@ -13,4 +14,5 @@ api_bp.register_blueprint(employees_bp, url_prefix="/employees")
 api_bp.register_blueprint(leaves_bp, url_prefix="/leaves")
 api_bp.register_blueprint(attendance_bp, url_prefix="/attendance")
 api_bp.register_blueprint(departments_bp, url_prefix="/departments")
+api_bp.register_blueprint(batch_bp, url_prefix="/batch")
 
@@ -1,12 +1,38 @@
-from datetime import datetime
+from datetime import date, datetime, timedelta, timezone
+from operator import itemgetter
 
 from flask import Blueprint, jsonify, request
+from sqlalchemy import DateTime, bindparam, exists, literal, select, tuple_
+from sqlalchemy.exc import IntegrityError
 
+import group_commit
+import rollups
+from cache import department_cache, employee_id_cache
 from db import db
 from models import AttendanceRecord, Employee
+from routes.helpers import (
+    STREAM_BATCH_SIZE,
+    conditional_get,
+    parse_fieldset,
+    parse_keyset_args,
+    stream_csv,
+    stream_ndjson,
+)
 
 attendance_bp = Blueprint("attendance", __name__)
 
+EVENT_TYPES = {"check_in", "check_out"}
+MAX_BATCH_EVENTS = 10000
+EXPORT_COLUMNS = [
+    "id",
+    "employee_id",
+    "first_name",
+    "last_name",
+    "check_in",
+    "check_out",
+    "worked_seconds",
+]
+
 
 @attendance_bp.post("/check-in")
 def check_in():
@@ -14,21 +40,38 @@ def check_in():
     employee_id = payload.get("employee_id")
     timestamp = payload.get("timestamp")
 
-    if not employee_id or not Employee.query.get(employee_id):
+    if not employee_id:
         return jsonify({"error": "Valid employee_id is required."}), 400
+    try:
+        dt = _parse_datetime(timestamp) if timestamp else datetime.utcnow()
+    except (TypeError, ValueError):
+        return jsonify({"error": "timestamp must be an ISO 8601 datetime."}), 400
 
-    dt = _parse_datetime(timestamp) if timestamp else datetime.utcnow()
-    open_record = AttendanceRecord.query.filter_by(
-        employee_id=employee_id, check_out=None
-    ).first()
-    if open_record:
+    # The partial unique index on open records rejects a second check-in, and
+    # the EXISTS guard rejects unknown employees, all in one statement.
+    table = AttendanceRecord.__table__
+    now = datetime.utcnow()
+    statement = (
+        table.insert()
+        .from_select(
+            ["employee_id", "check_in", "created_at", "updated_at"],
+            select(
+                literal(employee_id, table.c.employee_id.type),
+                literal(dt, DateTime()),
+                literal(now, DateTime()),
+                literal(now, DateTime()),
+            ).where(exists().where(Employee.id == employee_id)),
+        )
+        .returning(*table.c)
+    )
+    try:
+        record = _write(lambda session: session.execute(statement).first())
+    except IntegrityError:
         return jsonify({"error": "Employee already checked in."}), 400
 
-    record = AttendanceRecord(employee_id=employee_id, check_in=dt)
-    db.session.add(record)
-    db.session.commit()
-
-    return jsonify({"attendance": record.to_dict()}), 201
+    if record is None:
+        return jsonify({"error": "Valid employee_id is required."}), 400
+    return jsonify({"attendance": AttendanceRecord.serialize(record)}), 201
 
 
 @attendance_bp.post("/check-out")
@@ -37,36 +80,384 @@ def check_out():
     employee_id = payload.get("employee_id")
     timestamp = payload.get("timestamp")
 
-    if not employee_id or not Employee.query.get(employee_id):
+    if not employee_id:
         return jsonify({"error": "Valid employee_id is required."}), 400
+    try:
+        dt = _parse_datetime(timestamp) if timestamp else datetime.utcnow()
+    except (TypeError, ValueError):
+        return jsonify({"error": "timestamp must be an ISO 8601 datetime."}), 400
+
+    table = AttendanceRecord.__table__
+    # uq_attendance_records_open guarantees at most one open record.
+    open_record_id = (
+        select(table.c.id)
+        .where(table.c.employee_id == employee_id, table.c.check_out.is_(None))
+        .scalar_subquery()
+    )
+    statement = (
+        table.update()
+        .where(table.c.id == open_record_id, table.c.check_in <= dt)
+        .values(check_out=dt, updated_at=datetime.utcnow())
+        .returning(*table.c)
+    )
+
+    def close(session):
+        record = session.execute(statement).first()
+        if record is not None:
+            rollups.record_sessions(
+                session, [(record.employee_id, record.check_in, record.check_out)]
+            )
+        return record
+
+    record = _write(close)
+    if record is None:
+        return jsonify({"error": _check_out_error(employee_id)}), 400
+    return jsonify({"attendance": AttendanceRecord.serialize(record)})
 
-    record = AttendanceRecord.query.filter_by(
-        employee_id=employee_id, check_out=None
-    ).order_by(AttendanceRecord.check_in.desc()).first()
-    if not record:
-        return jsonify({"error": "No active check-in found."}), 400
 
-    dt = _parse_datetime(timestamp) if timestamp else datetime.utcnow()
-    if dt < record.check_in:
-        return jsonify({"error": "Check-out cannot be before check-in."}), 400
+@attendance_bp.post("/batch")
+def ingest_batch():
+    payload = request.get_json() or {}
+    events = payload.get("events")
+    if not isinstance(events, list) or not events:
+        return jsonify({"error": "events must be a non-empty list."}), 400
+    if len(events) > MAX_BATCH_EVENTS:
+        return jsonify({"error": f"At most {MAX_BATCH_EVENTS} events per batch."}), 400
+
+    errors = {}
+    parsed = []
+    now = datetime.utcnow()
+    for index, event in enumerate(events):
+        error, parsed_event = _parse_event(event, now)
+        if error:
+            errors[index] = error
+        else:
+            parsed.append((index, *parsed_event))
+
+    employee_ids = {employee_id for _, employee_id, _, _ in parsed}
+    known_ids = {
+        employee_id
+        for (employee_id,) in db.session.query(Employee.id).filter(
+            Employee.id.in_(employee_ids)
+        )
+    }
+    open_records = {}
+    for record_id, employee_id, checked_in in (
+        db.session.query(
+            AttendanceRecord.id, AttendanceRecord.employee_id, AttendanceRecord.check_in
+        )
+        .filter(
+            AttendanceRecord.employee_id.in_(known_ids),
+            AttendanceRecord.check_out.is_(None),
+        )
+        .order_by(AttendanceRecord.check_in)
+    ):
+        open_records[employee_id] = {"id": record_id, "check_in": checked_in}
 
-    record.check_out = dt
-    db.session.commit()
+    inserts = []
+    closes = []
+    sessions = []
+    for index, employee_id, event_type, dt in sorted(parsed, key=itemgetter(1, 3)):
+        if employee_id not in known_ids:
+            errors[index] = "Valid employee_id is required."
+            continue
+        current = open_records.get(employee_id)
+        if event_type == "check_in":
+            if current:
+                errors[index] = "Employee already checked in."
+                continue
+            record = {"employee_id": employee_id, "check_in": dt, "check_out": None}
+            inserts.append(record)
+            open_records[employee_id] = record
+        else:
+            if not current:
+                errors[index] = "No active check-in found."
+                continue
+            if dt < current["check_in"]:
+                errors[index] = "Check-out cannot be before check-in."
+                continue
+            current["check_out"] = dt
+            sessions.append((employee_id, current["check_in"], dt))
+            if "id" in current:
+                closes.append({"record_id": current["id"], "check_out": dt})
+            open_records.pop(employee_id)
 
-    return jsonify({"attendance": record.to_dict()})
+    table = AttendanceRecord.__table__
+    try:
+        if inserts:
+            db.session.execute(table.insert(), inserts)
+        if closes:
+            db.session.execute(
+                table.update()
+                .where(table.c.id == bindparam("record_id"))
+                .values(check_out=bindparam("check_out"), updated_at=now),
+                closes,
+            )
+        rollups.record_sessions(db.session, sessions)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return (
+            jsonify({"error": "A concurrent check-in conflicted with this batch; retry."}),
+            409,
+        )
+
+    return jsonify(
+        {
+            "processed": len(events) - len(errors),
+            "failed": len(errors),
+            "errors": [
+                {"index": index, "error": errors[index]} for index in sorted(errors)
+            ],
+        }
+    )
 
 
 @attendance_bp.get("/<int:employee_id>")
 def list_attendance(employee_id):
-    if not Employee.query.get(employee_id):
+    fields, error = parse_fieldset(AttendanceRecord)
+    if error:
+        return jsonify({"error": error}), 400
+
+    limit, after, error = parse_keyset_args(
+        decode_cursor=_decode_cursor, cursor_error="after is not a valid cursor."
+    )
+    if error:
+        return jsonify({"error": error}), 400
+    start, end, error = _parse_range()
+    if error:
+        return jsonify({"error": error}), 400
+
+    if not employee_id_cache.exists(employee_id):
         return jsonify({"error": "Employee not found."}), 404
 
-    records = AttendanceRecord.query.filter_by(employee_id=employee_id).all()
-    return jsonify({"records": [record.to_dict() for record in records]})
+    base = AttendanceRecord.query.filter_by(employee_id=employee_id)
+    if start is not None:
+        base = base.filter(AttendanceRecord.check_in >= start)
+    if end is not None:
+        base = base.filter(AttendanceRecord.check_in < end)
+    if after is not None:
+        base = base.filter(
+            tuple_(AttendanceRecord.check_in, AttendanceRecord.id) > tuple_(*after)
+        )
+    query = base.options(*AttendanceRecord.load_options(fields)).order_by(
+        AttendanceRecord.check_in, AttendanceRecord.id
+    )
+
+    def build():
+        if limit is None:
+            records = query.all()
+            return jsonify({"records": [record.to_dict(fields) for record in records]})
+
+        records = query.limit(limit).all()
+        next_after = _encode_cursor(records[-1]) if len(records) == limit else None
+        return jsonify(
+            {
+                "records": [record.to_dict(fields) for record in records],
+                "next_after": next_after,
+            }
+        )
+
+    return conditional_get(
+        base.order_by(AttendanceRecord.check_in, AttendanceRecord.id),
+        build,
+        [AttendanceRecord.updated_at],
+        limit=limit,
+    )
+
+
+@attendance_bp.get("/<int:employee_id>/summary")
+def employee_summary(employee_id):
+    granularity, start_day, end_day, error = _parse_summary_args()
+    if error:
+        return jsonify({"error": error}), 400
+    if not employee_id_cache.exists(employee_id):
+        return jsonify({"error": "Employee not found."}), 404
+
+    periods = rollups.summarize(
+        granularity, start_day, end_day, employee_id=employee_id
+    )
+    return jsonify(
+        {"employee_id": employee_id, "granularity": granularity, "periods": periods}
+    )
+
+
+@attendance_bp.get("/departments/<int:department_id>/summary")
+def department_summary(department_id):
+    granularity, start_day, end_day, error = _parse_summary_args()
+    if error:
+        return jsonify({"error": error}), 400
+    if department_cache.get(department_id) is None:
+        return jsonify({"error": "Department not found."}), 404
+
+    periods = rollups.summarize(
+        granularity, start_day, end_day, department_id=department_id
+    )
+    return jsonify(
+        {
+            "department_id": department_id,
+            "granularity": granularity,
+            "periods": periods,
+        }
+    )
+
+
+@attendance_bp.get("/export")
+def export_attendance():
+    start, end, error = _parse_range()
+    if error:
+        return jsonify({"error": error}), 400
+    if start is None or end is None:
+        return jsonify({"error": "Provide month=YYYY-MM or both from and to."}), 400
+    export_format = (request.args.get("format") or "ndjson").lower()
+    if export_format not in {"ndjson", "csv"}:
+        return jsonify({"error": "format must be ndjson or csv."}), 400
+
+    table = AttendanceRecord.__table__
+    statement = (
+        select(
+            table.c.id,
+            table.c.employee_id,
+            Employee.first_name,
+            Employee.last_name,
+            table.c.check_in,
+            table.c.check_out,
+        )
+        .join(Employee, Employee.id == table.c.employee_id)
+        .where(table.c.check_in >= start, table.c.check_in < end)
+        .order_by(table.c.check_in, table.c.id)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+
+    def rows():
+        for row in db.session.execute(statement):
+            worked = (
+                int((row.check_out - row.check_in).total_seconds())
+                if row.check_out
+                else None
+            )
+            yield (
+                row.id,
+                row.employee_id,
+                row.first_name,
+                row.last_name,
+                row.check_in.isoformat(),
+                row.check_out.isoformat() if row.check_out else None,
+                worked,
+            )
+
+    if export_format == "csv":
+        return stream_csv(rows(), EXPORT_COLUMNS, lambda values: values)
+    return stream_ndjson(rows(), lambda values: dict(zip(EXPORT_COLUMNS, values)))
+
+
+def _write(work):
+    """Run ``work(session)`` and commit, via the group-commit writer when enabled."""
+    if group_commit.writer.enabled:
+        return group_commit.writer.run(work)
+    try:
+        result = work(db.session)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return result
+
+
+def _check_out_error(employee_id):
+    # Only reached when the conditional UPDATE matched nothing.
+    if not employee_id_cache.exists(employee_id):
+        return "Valid employee_id is required."
+    has_open_record = db.session.query(
+        AttendanceRecord.query.filter_by(
+            employee_id=employee_id, check_out=None
+        ).exists()
+    ).scalar()
+    if not has_open_record:
+        return "No active check-in found."
+    return "Check-out cannot be before check-in."
+
+
+def _encode_cursor(record):
+    return f"{record.check_in.isoformat()},{record.id}"
+
+
+def _decode_cursor(value):
+    check_in, _, record_id = value.rpartition(",")
+    return datetime.fromisoformat(check_in), int(record_id)
+
+
+def _parse_range():
+    """Read ``month`` or ``from``/``to`` into a half-open ``[start, end)`` range."""
+    month = request.args.get("month")
+    if month:
+        try:
+            start = datetime.strptime(month, "%Y-%m")
+        except ValueError:
+            return None, None, "month must be in YYYY-MM format."
+        end = (start + timedelta(days=32)).replace(day=1)
+        return start, end, None
+
+    try:
+        start = _parse_bound(request.args.get("from"), inclusive_end=False)
+        end = _parse_bound(request.args.get("to"), inclusive_end=True)
+    except ValueError:
+        return None, None, "from and to must be ISO 8601 dates or datetimes."
+    if start is not None and end is not None and start >= end:
+        return None, None, "from must be before to."
+    return start, end, None
+
+
+def _parse_summary_args():
+    granularity = (request.args.get("granularity") or "day").lower()
+    if granularity not in rollups.GRANULARITIES:
+        return None, None, None, "granularity must be day, week, or month."
+    start, end, error = _parse_range()
+    if error:
+        return None, None, None, error
+
+    start_day = start.date() if start is not None else None
+    end_day = None
+    if end is not None:
+        # Rollup days are whole days: keep any day the range reaches into.
+        end_day = end.date()
+        if end.time() != datetime.min.time():
+            end_day += timedelta(days=1)
+    return granularity, start_day, end_day, None
+
+
+def _parse_bound(value, inclusive_end):
+    if not value:
+        return None
+    if len(value) == 10:
+        day = datetime.combine(date.fromisoformat(value), datetime.min.time())
+        # A bare ``to`` date covers that whole day.
+        return day + timedelta(days=1) if inclusive_end else day
+    return _parse_datetime(value)
+
+
+def _parse_event(event, default_timestamp):
+    if not isinstance(event, dict):
+        return "Event must be an object.", None
+    event_type = event.get("type")
+    if event_type not in EVENT_TYPES:
+        return "type must be check_in or check_out.", None
+    employee_id = event.get("employee_id")
+    if not isinstance(employee_id, int) or isinstance(employee_id, bool):
+        return "Valid employee_id is required.", None
+    timestamp = event.get("timestamp")
+    try:
+        dt = _parse_datetime(timestamp) if timestamp else default_timestamp
+    except (TypeError, ValueError):
+        return "timestamp must be an ISO 8601 datetime.", None
+    return None, (employee_id, event_type, dt)
 
 
 def _parse_datetime(value):
     if not value:
         raise ValueError("Invalid timestamp.")
-    return datetime.fromisoformat(value)
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
 
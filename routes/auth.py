@@ -1,9 +1,22 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 
+from db import db
 from models import Employee
+from security import (
+    hash_password,
+    issue_token,
+    needs_rehash,
+    read_token,
+    token_cache,
+    verify_password,
+)
 
 auth_bp = Blueprint("auth", __name__)
 
+PROFILE_FIELDS = tuple(
+    name for name in Employee.SERIALIZERS if name != "leave_balances"
+)
+
 
 @auth_bp.post("/login")
 def login():
@@ -11,30 +24,60 @@ def login():
     email = (payload.get("email") or "").strip().lower()
     password = payload.get("password") or ""
 
+    if not isinstance(password, str):
+        return jsonify({"error": "Password must be a string."}), 400
     if not email or not password:
         return (
             jsonify({"error": "Email and password are required."}),
             400,
         )
 
-    user = Employee.query.filter_by(email=email, password=password).first()
-    if not user:
+    user = Employee.query.filter_by(email=email).first()
+    if not verify_password(user.password if user else None, password):
         return jsonify({"error": "Invalid credentials."}), 401
 
-    return jsonify({"user": user.to_dict()})
+    if needs_rehash(user.password):
+        user.password = hash_password(password)
+        db.session.commit()
+
+    return jsonify(
+        {
+            "user": user.to_dict(),
+            "token": issue_token(user.id),
+            "expires_in": current_app.config["AUTH_TOKEN_TTL"],
+        }
+    )
 
 
 @auth_bp.get("/me")
 def me():
-    user_id = request.headers.get("X-User-ID")
-    if not user_id:
-        return jsonify({"error": "Missing X-User-ID header."}), 400
+    token = _bearer_token()
+    if token:
+        cached = token_cache.get(token)
+        if cached:
+            return jsonify({"user": cached[1]})
+        user_id, expires_at = read_token(token)
+        if user_id is None:
+            return jsonify({"error": "Invalid or expired token."}), 401
+    elif current_app.config["AUTH_ALLOW_USER_ID_HEADER"]:
+        user_id = request.headers.get("X-User-ID")
+        if not user_id:
+            return jsonify({"error": "Missing X-User-ID header."}), 400
+    else:
+        return jsonify({"error": "Missing bearer token."}), 401
 
-    user = Employee.query.get(user_id)
+    user = Employee.query.options(*Employee.load_options(PROFILE_FIELDS)).get(user_id)
     if not user:
         return jsonify({"error": "User not found."}), 404
 
-    user_payload = user.to_dict()
-    user_payload.pop("leave_balances", None)
+    user_payload = user.to_dict(PROFILE_FIELDS)
+    if token:
+        token_cache.put(token, user.id, user_payload, expires_at)
     return jsonify({"user": user_payload})
 
+
+def _bearer_token():
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    return token.strip()
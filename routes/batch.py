@@ -0,0 +1,129 @@
+"""``POST /batch``: several API calls in one round trip.
+
+Sub-requests go through the normal Flask pipeline (routing, hooks, error
+handlers) in-process. A sequential batch runs inside the batch request's app
+context, so every sub-request shares its DB session and connection (rolled
+back after each write, so a failed one leaves nothing behind). With
+``"parallel": true`` (GETs only) they run on worker threads instead, each
+with its own app context and session.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Blueprint, current_app, jsonify, request
+from werkzeug.test import EnvironBuilder
+
+from db import db
+
+batch_bp = Blueprint("batch", __name__)
+
+MAX_BATCH_REQUESTS = 20
+MAX_PARALLEL = 4
+METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+# Sent along with every sub-request unless it sets its own.
+INHERITED_HEADERS = ("Authorization", "X-User-ID")
+
+
+@batch_bp.post("")
+def run_batch():
+    payload = request.get_json(silent=True) or {}
+    items = payload.get("requests")
+    parallel = bool(payload.get("parallel"))
+
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "requests must be a non-empty list."}), 400
+    if len(items) > MAX_BATCH_REQUESTS:
+        return jsonify({"error": f"At most {MAX_BATCH_REQUESTS} requests per batch."}), 400
+
+    environs = []
+    errors = []
+    for index, item in enumerate(items):
+        environ, error = _build_environ(item)
+        if error:
+            errors.append({"index": index, "error": error})
+        environs.append(environ)
+    if errors:
+        return jsonify({"errors": errors}), 400
+
+    app = current_app._get_current_object()
+    if parallel:
+        if any(environ["REQUEST_METHOD"] != "GET" for environ in environs):
+            return jsonify({"error": "Parallel batches may only contain GET requests."}), 400
+        # A thread has no app context, so pushing the request context gives
+        # each sub-request its own, and with it its own session.
+        with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL, len(environs))) as pool:
+            responses = list(pool.map(lambda environ: _dispatch(app, environ), environs))
+    else:
+        responses = []
+        for environ in environs:
+            write = environ["REQUEST_METHOD"] != "GET"
+            if write:
+                # Start writes on a fresh transaction rather than upgrading
+                # the read snapshot earlier sub-requests left open.
+                db.session.rollback()
+            responses.append(_dispatch(app, environ))
+            if write:
+                # A write that failed after touching ORM objects leaves them
+                # dirty in the shared session; later reads must not see them.
+                db.session.rollback()
+
+    return jsonify({"responses": responses})
+
+
+def _build_environ(item):
+    if not isinstance(item, dict):
+        return None, "Each request must be an object."
+    method = str(item.get("method") or "GET").upper()
+    path = item.get("path")
+    headers = item.get("headers") or {}
+
+    if method not in METHODS:
+        return None, f"method must be one of: {', '.join(sorted(METHODS))}."
+    if not isinstance(path, str) or not path.startswith("/"):
+        return None, "path must be a string starting with '/'."
+    if not isinstance(headers, dict):
+        return None, "headers must be an object."
+
+    inherited = {
+        name: request.headers[name] for name in INHERITED_HEADERS if name in request.headers
+    }
+    inherited.update((str(name), str(value)) for name, value in headers.items())
+    builder = EnvironBuilder(
+        path=path,
+        base_url=request.url_root,
+        method=method,
+        headers=inherited,
+        json=item.get("body"),
+        environ_base={"REMOTE_ADDR": request.remote_addr},
+    )
+    try:
+        return builder.get_environ(), None
+    finally:
+        builder.close()
+
+
+def _dispatch(app, environ):
+    with app.request_context(environ):
+        blueprint = request.blueprint or ""
+        if request.endpoint and (not blueprint.startswith("api.") or blueprint == "api.batch"):
+            return {"status": 400, "body": {"error": "Only API routes can be batched."}}
+
+        try:
+            response = app.full_dispatch_request()
+        except Exception as exc:
+            db.session.rollback()
+            response = app.handle_exception(exc)
+
+        try:
+            if response.status_code == 304:
+                body = None
+            elif response.is_json:
+                body = response.get_json()
+            else:
+                body = response.get_data(as_text=True)
+            headers = {
+                name: value for name, value in response.headers if name != "Content-Length"
+            }
+        finally:
+            response.close()
+        return {"status": response.status_code, "headers": headers, "body": body}
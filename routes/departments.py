@@ -1,15 +1,24 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 
+from cache import department_cache
 from db import db
 from models import Department
+from routes.helpers import parse_fieldset
 
 departments_bp = Blueprint("departments", __name__)
 
 
 @departments_bp.get("")
 def list_departments():
-    departments = Department.query.all()
-    return jsonify({"departments": [dept.to_dict() for dept in departments]})
+    fields, error = parse_fieldset(Department)
+    if error:
+        return jsonify({"error": error}), 400
+
+    etag, body = department_cache.list_payload(fields)
+    response = current_app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 
 @departments_bp.post("")
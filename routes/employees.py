@@ -1,10 +1,27 @@
+import csv
+import io
+import json
+import pickle
+import shutil
+import tempfile
 from datetime import datetime, date
+from itertools import islice
 
 from flask import Blueprint, jsonify, request
 from sqlalchemy.exc import IntegrityError
 
+from cache import department_cache
 from db import db
-from models import Department, Employee
+from models import Employee
+from security import hash_password, hash_passwords, token_cache
+from routes.helpers import (
+    STREAM_BATCH_SIZE,
+    conditional_get,
+    parse_fieldset,
+    parse_keyset_args,
+    stream_json_array,
+    wants_stream,
+)
 
 employees_bp = Blueprint("employees", __name__)
 
@@ -17,12 +34,53 @@ LEAVE_NUMERIC_FIELDS = [
     "maternity_leave_total",
     "maternity_leave_used",
 ]
+BULK_BATCH_SIZE = 1000
+# Uploads up to this size are spooled in memory, larger ones on disk.
+BULK_SPOOL_SIZE = 1024 * 1024
+NDJSON_MIMETYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
 
 
 @employees_bp.get("")
 def list_employees():
-    employees = Employee.query.all()
-    return jsonify({"employees": [emp.to_dict() for emp in employees]})
+    limit, after, error = parse_keyset_args()
+    if error:
+        return jsonify({"error": error}), 400
+    fields, error = parse_fieldset(Employee)
+    if error:
+        return jsonify({"error": error}), 400
+
+    base = Employee.query
+    if after is not None:
+        base = base.filter(Employee.id > after)
+    serializer = Employee.row_serializer(fields)
+    query = serializer.select(base).order_by(Employee.id)
+    serialize = serializer.serialize
+
+    def build():
+        if wants_stream():
+            rows = query.limit(limit) if limit is not None else query
+            rows = rows.yield_per(STREAM_BATCH_SIZE)
+            return stream_json_array("employees", rows, serialize)
+
+        if limit is None:
+            return jsonify({"employees": [serialize(row) for row in query]})
+
+        rows = query.limit(limit).all()
+        next_after = rows[-1][0] if len(rows) == limit else None
+        return jsonify(
+            {
+                "employees": [serialize(row) for row in rows],
+                "next_after": next_after,
+            }
+        )
+
+    return conditional_get(
+        base.order_by(Employee.id),
+        build,
+        [Employee.updated_at],
+        extra=_embedded_versions(fields),
+        limit=limit,
+    )
 
 
 @employees_bp.post("")
@@ -32,23 +90,9 @@ def create_employee():
     if errors:
         return jsonify({"errors": errors}), 400
 
-    gender = _normalize_gender(payload.get("gender"))
-    employee = Employee(
-        first_name=payload["first_name"].strip(),
-        last_name=payload["last_name"].strip(),
-        email=payload["email"].strip().lower(),
-        role=payload.get("role"),
-        gender=gender,
-        password=payload.get("password") or "password123",
-        department_id=payload["department_id"],
-        hire_date=_parse_date(payload.get("hire_date")) if payload.get("hire_date") else date.today(),
-        sick_leave_total=_coerce_int(payload.get("sick_leave_total"), 10),
-        sick_leave_used=_coerce_int(payload.get("sick_leave_used"), 0),
-        vacation_leave_total=_coerce_int(payload.get("vacation_leave_total"), 15),
-        vacation_leave_used=_coerce_int(payload.get("vacation_leave_used"), 0),
-        maternity_leave_total=_maternity_value(payload.get("maternity_leave_total"), gender),
-        maternity_leave_used=_maternity_value(payload.get("maternity_leave_used"), gender),
-    )
+    values = _employee_values(payload)
+    values["password"] = hash_password(values["password"])
+    employee = Employee(**values)
     db.session.add(employee)
 
     try:
@@ -60,16 +104,146 @@ def create_employee():
     return jsonify({"employee": employee.to_dict()}), 201
 
 
+@employees_bp.post("/bulk")
+def bulk_create_employees():
+    rows = _read_bulk_rows()
+    if rows is None:
+        return (
+            jsonify({"error": "Send text/csv, NDJSON, or a JSON array of employees."}),
+            415,
+        )
+
+    dry_run = request.args.get("dry_run", "").lower() in {"1", "true", "yes"}
+    try:
+        if dry_run:
+            valid, _batches, row_errors = _validate_bulk_rows(rows)
+        else:
+            with tempfile.TemporaryFile() as pending:
+                valid, batches, row_errors = _validate_bulk_rows(rows, pending)
+                # Validation and hashing only read. End their read transaction
+                # so the write one starts from a fresh snapshot and only lasts
+                # as long as the INSERTs.
+                db.session.rollback()
+                pending.seek(0)
+                try:
+                    for _ in range(batches):
+                        db.session.execute(Employee.__table__.insert(), pickle.load(pending))
+                    db.session.commit()
+                except IntegrityError:
+                    db.session.rollback()
+                    return jsonify({"error": "Email already exists."}), 409
+    except UnicodeDecodeError:
+        # CSV and NDJSON bodies are decoded lazily, while rows are validated.
+        db.session.rollback()
+        return jsonify({"error": "Upload must be UTF-8 encoded."}), 400
+
+    report = {
+        "created": 0 if dry_run else valid,
+        "valid": valid,
+        "failed": len(row_errors),
+        "errors": row_errors,
+    }
+    return jsonify(report), 201 if valid and not dry_run else 200
+
+
+def _validate_bulk_rows(rows, pending=None):
+    """Validate ``rows``; with ``pending``, also hash their passwords and pickle
+    each batch of insertable values into it. Returns ``(valid, batches,
+    row_errors)``."""
+    known_departments = dict.fromkeys(department_cache.ids(), True)
+    password_hashes = {}
+    seen_emails = set()
+    row_errors = []
+    valid = 0
+    batches = 0
+
+    while True:
+        batch = list(islice(rows, BULK_BATCH_SIZE))
+        if not batch:
+            break
+
+        emails = {
+            payload["email"].strip().lower()
+            for _, payload, _ in batch
+            if payload and isinstance(payload.get("email"), str)
+        }
+        existing_emails = {
+            email
+            for (email,) in db.session.query(Employee.email).filter(
+                Employee.email.in_(emails)
+            )
+        }
+
+        values = []
+        for row_number, payload, parse_error in batch:
+            errors = [parse_error] if parse_error else []
+            if not errors:
+                try:
+                    errors = _validate_employee_payload(
+                        payload,
+                        creation=True,
+                        known_departments=known_departments,
+                    )
+                    if not errors:
+                        row_values = _employee_values(payload)
+                except (AttributeError, TypeError, ValueError):
+                    errors = ["Row contains invalid values."]
+            if not errors:
+                email = row_values["email"]
+                if email in existing_emails or email in seen_emails:
+                    errors = ["Email already exists."]
+                else:
+                    seen_emails.add(email)
+                    values.append(row_values)
+            if errors:
+                row_errors.append({"row": row_number, "errors": errors})
+
+        valid += len(values)
+        if values and pending is not None:
+            hashed = hash_passwords(
+                [row_values["password"] for row_values in values], password_hashes
+            )
+            for row_values, password_hash in zip(values, hashed):
+                row_values["password"] = password_hash
+            pickle.dump(values, pending)
+            batches += 1
+
+    return valid, batches, row_errors
+
+
 @employees_bp.get("/<int:employee_id>")
 def get_employee(employee_id):
-    employee = Employee.query.get_or_404(employee_id)
-    return jsonify({"employee": employee.to_dict()})
+    fields, error = parse_fieldset(Employee)
+    if error:
+        return jsonify({"error": error}), 400
+
+    def build():
+        employee = Employee.query.options(*Employee.load_options(fields)).get_or_404(
+            employee_id
+        )
+        return jsonify({"employee": employee.to_dict(fields)})
+
+    return conditional_get(
+        Employee.query.filter(Employee.id == employee_id),
+        build,
+        [Employee.updated_at],
+        extra=_embedded_versions(fields),
+        require_rows=True,
+    )
 
 
 @employees_bp.get("/<int:employee_id>/leave-summary")
 def get_employee_leave_summary(employee_id):
-    employee = Employee.query.get_or_404(employee_id)
-    return jsonify({"leave_summary": employee.leave_balances()})
+    def build():
+        employee = Employee.query.get_or_404(employee_id)
+        return jsonify({"leave_summary": employee.leave_balances()})
+
+    return conditional_get(
+        Employee.query.filter(Employee.id == employee_id),
+        build,
+        [Employee.updated_at],
+        require_rows=True,
+    )
 
 
 @employees_bp.patch("/<int:employee_id>")
@@ -110,10 +284,14 @@ def update_employee(employee_id):
             employee.maternity_leave_used = 0
 
     if "department_id" in payload:
-        department = Department.query.get(payload["department_id"])
+        try:
+            department_id = _as_int(payload["department_id"])
+        except (TypeError, ValueError):
+            return jsonify({"error": "Department id must be an integer."}), 400
+        department = department_cache.get(department_id)
         if not department:
             return jsonify({"error": "Department not found."}), 404
-        employee.department_id = department.id
+        employee.department_id = department["id"]
 
     for field in LEAVE_NUMERIC_FIELDS:
         if field not in payload:
@@ -129,10 +307,11 @@ def update_employee(employee_id):
         )
 
     db.session.commit()
+    token_cache.discard_user(employee.id)
     return jsonify({"employee": employee.to_dict()})
 
 
-def _validate_employee_payload(payload, creation=False):
+def _validate_employee_payload(payload, creation=False, known_departments=None):
     errors = []
 
     first_name = (payload.get("first_name") or "").strip()
@@ -154,9 +333,24 @@ def _validate_employee_payload(payload, creation=False):
         errors.append("Email must be valid.")
 
     if department_id:
-        department = Department.query.get(department_id)
-        if not department:
-            errors.append("Department not found.")
+        try:
+            department_id = _as_int(department_id)
+        except (TypeError, ValueError):
+            errors.append("Department id must be an integer.")
+        else:
+            if known_departments is None:
+                department_exists = department_cache.get(department_id) is not None
+            else:
+                # ``id -> exists`` memo for bulk imports; ids missing from it
+                # are checked once (the cache falls back to the database on a
+                # miss).
+                if department_id not in known_departments:
+                    known_departments[department_id] = (
+                        department_cache.get(department_id) is not None
+                    )
+                department_exists = known_departments[department_id]
+            if not department_exists:
+                errors.append("Department not found.")
 
     if gender:
         normalized_gender = gender.strip().lower()
@@ -169,7 +363,7 @@ def _validate_employee_payload(payload, creation=False):
         if value is None:
             continue
         try:
-            numeric_values[field] = int(value)
+            numeric_values[field] = _as_int(value)
         except (TypeError, ValueError):
             errors.append(f"{field} must be an integer.")
             continue
@@ -183,6 +377,87 @@ def _validate_employee_payload(payload, creation=False):
     return errors
 
 
+def _embedded_versions(fields):
+    if fields is None or "department" in fields:
+        return (department_cache.list_payload()[0],)
+    return ()
+
+
+def _employee_values(payload):
+    gender = _normalize_gender(payload.get("gender"))
+    return {
+        "first_name": payload["first_name"].strip(),
+        "last_name": payload["last_name"].strip(),
+        "email": payload["email"].strip().lower(),
+        "role": payload.get("role"),
+        "gender": gender,
+        "password": payload.get("password") or "password123",
+        "department_id": _as_int(payload["department_id"]),
+        "hire_date": _parse_date(payload.get("hire_date")) if payload.get("hire_date") else date.today(),
+        "sick_leave_total": _coerce_int(payload.get("sick_leave_total"), 10),
+        "sick_leave_used": _coerce_int(payload.get("sick_leave_used"), 0),
+        "vacation_leave_total": _coerce_int(payload.get("vacation_leave_total"), 15),
+        "vacation_leave_used": _coerce_int(payload.get("vacation_leave_used"), 0),
+        "maternity_leave_total": _maternity_value(payload.get("maternity_leave_total"), gender),
+        "maternity_leave_used": _maternity_value(payload.get("maternity_leave_used"), gender),
+    }
+
+
+def _read_bulk_rows():
+    """Yield ``(row_number, payload, parse_error)`` from the request body.
+
+    CSV and NDJSON bodies are first copied into a temporary file, so a slow
+    upload is fully received before any database work starts, then parsed
+    from it line by line so the upload is never held in memory as a whole.
+    """
+    mimetype = request.mimetype
+    if mimetype == "text/csv":
+        return _csv_rows(io.TextIOWrapper(_spool_upload(), encoding="utf-8", newline=""))
+    if mimetype in NDJSON_MIMETYPES:
+        return _ndjson_rows(io.TextIOWrapper(_spool_upload(), encoding="utf-8"))
+    if mimetype == "application/json":
+        payload = request.get_json(silent=True)
+        if isinstance(payload, list):
+            return _object_rows(enumerate(payload, start=1))
+    return None
+
+
+def _spool_upload():
+    upload = tempfile.SpooledTemporaryFile(max_size=BULK_SPOOL_SIZE)
+    shutil.copyfileobj(request.stream, upload)
+    upload.seek(0)
+    return upload
+
+
+def _csv_rows(stream):
+    with stream:
+        for row_number, row in enumerate(csv.DictReader(stream), start=1):
+            yield row_number, {key: value for key, value in row.items() if value != ""}, None
+
+
+def _ndjson_rows(stream):
+    row_number = 0
+    with stream:
+        for line in stream:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                payload = json.loads(line)
+            except ValueError:
+                yield row_number, None, "Invalid JSON."
+                continue
+            yield from _object_rows([(row_number, payload)])
+
+
+def _object_rows(numbered_payloads):
+    for row_number, payload in numbered_payloads:
+        if isinstance(payload, dict):
+            yield row_number, payload, None
+        else:
+            yield row_number, None, "Row must be a JSON object."
+
+
 def _parse_date(value):
     if not value:
         return date.today()
@@ -200,11 +475,19 @@ def _coerce_int(value, default):
     if value is None:
         return default
     try:
-        return int(value)
+        return _as_int(value)
     except (TypeError, ValueError):
         return default
 
 
+def _as_int(value):
+    """``int(value)`` that refuses to truncate: ``2.7`` raises ``ValueError``."""
+    number = int(value)
+    if isinstance(value, float) and number != value:
+        raise ValueError(f"Not an integer: {value!r}")
+    return number
+
+
 def _validate_leave_usage_limits(errors, numeric_values, prefix):
     total_key = f"{prefix}_leave_total"
     used_key = f"{prefix}_leave_used"
@@ -0,0 +1,158 @@
+import csv
+import hashlib
+import io
+
+from flask import (
+    Response,
+    abort,
+    current_app,
+    make_response,
+    request,
+    stream_with_context,
+)
+from sqlalchemy import func, select
+from werkzeug.http import is_resource_modified
+
+from db import db
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+STREAM_BATCH_SIZE = 500
+
+
+def parse_keyset_args(decode_cursor=int, cursor_error="after must be an integer."):
+    """Read ``limit``/``after`` query args, returning ``(limit, after, error)``."""
+    limit_param = request.args.get("limit")
+    after_param = request.args.get("after")
+
+    limit = None
+    if limit_param is not None:
+        try:
+            limit = int(limit_param)
+        except ValueError:
+            return None, None, "limit must be an integer."
+        if limit < 1 or limit > MAX_PAGE_LIMIT:
+            return None, None, f"limit must be between 1 and {MAX_PAGE_LIMIT}."
+
+    after = None
+    if after_param is not None:
+        try:
+            after = decode_cursor(after_param)
+        except ValueError:
+            return None, None, cursor_error
+        if limit is None:
+            limit = DEFAULT_PAGE_LIMIT
+
+    return limit, after, None
+
+
+def parse_fieldset(model):
+    """Resolve ``?fields=``/``?view=`` into ``(fields, error)``; ``None`` is full."""
+    fields_param = request.args.get("fields")
+    view = (request.args.get("view") or "full").lower()
+
+    if fields_param:
+        requested = dict.fromkeys(
+            name.strip() for name in fields_param.split(",") if name.strip()
+        )
+        unknown = [name for name in requested if name not in model.SERIALIZERS]
+        if unknown:
+            return None, f"Unknown fields: {', '.join(unknown)}."
+        # Canonical order, so every spelling of a fieldset shares one compiled
+        # serializer and one cache entry.
+        return tuple(name for name in model.SERIALIZERS if name in requested), None
+
+    if view == "full":
+        return None, None
+    if view == "compact":
+        return model.COMPACT_FIELDS, None
+    return None, "view must be compact or full."
+
+
+def wants_stream():
+    return request.args.get("stream", "").lower() in {"1", "true", "yes"}
+
+
+def stream_json_array(key, rows, serialize):
+    """Stream ``{"<key>": [...]}`` one row at a time instead of building the list."""
+    dumps = current_app.json.dumps
+
+    def generate():
+        yield '{"%s": [' % key
+        first = True
+        for row in rows:
+            if not first:
+                yield ","
+            first = False
+            yield dumps(serialize(row))
+        yield "]}"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+
+def stream_ndjson(rows, serialize):
+    dumps = current_app.json.dumps
+
+    def generate():
+        for row in rows:
+            yield dumps(serialize(row)) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+def stream_csv(rows, header, to_values):
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(to_values(row))
+            if buffer.tell() >= 65536:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return Response(stream_with_context(generate()), mimetype="text/csv")
+
+
+def conditional_get(query, build, timestamps, extra=(), require_rows=False, limit=None):
+    """Answer a GET with 304 when the rows behind it are unchanged.
+
+    The validators come from ``count(*)`` and ``max()`` of ``timestamps`` over
+    ``query``, computed in SQL, so an unchanged resource is never loaded or
+    serialized. ``extra`` folds in versions of data embedded from elsewhere.
+    For a page, pass its ``limit`` and order ``query`` the way it is served:
+    the validators then cover just that page instead of every matching row.
+    """
+    if limit is None:
+        aggregates = [func.count(), *(func.max(column) for column in timestamps)]
+        count, *maxima = query.order_by(None).with_entities(*aggregates).one()
+    else:
+        page = (
+            query.with_entities(
+                *(column.label(f"t{index}") for index, column in enumerate(timestamps))
+            )
+            .limit(limit)
+            .subquery()
+        )
+        aggregates = [func.count(), *(func.max(column) for column in page.c)]
+        count, *maxima = db.session.execute(select(*aggregates).select_from(page)).one()
+    if require_rows and not count:
+        abort(404)
+
+    last_modified = max((value for value in maxima if value is not None), default=None)
+    fingerprint = "|".join(
+        str(part) for part in (request.full_path, count, *maxima, *extra)
+    )
+    etag = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = make_response(build())
+    else:
+        response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response
@@ -1,15 +1,29 @@
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
 from flask import Blueprint, jsonify, request
+from sqlalchemy import func, select
 
+from cache import employee_id_cache
 from db import db
 from models import Employee, LeaveRequest
+from routes.helpers import conditional_get, parse_fieldset
 
 leaves_bp = Blueprint("leaves", __name__)
 
+LEAVE_STATUSES = {"pending", "approved", "rejected"}
+ACTIVE_LEAVE_STATUSES = ("pending", "approved")
+LEAVE_TYPES = {"sick", "vacation", "maternity"}
+MAX_BULK_APPROVALS = 1000
+MAX_CALENDAR_DAYS = 366
+
 
 @leaves_bp.get("")
 def list_leaves():
+    fields, error = parse_fieldset(LeaveRequest)
+    if error:
+        return jsonify({"error": error}), 400
+
+    base = LeaveRequest.query
     employee_id_param = request.args.get("employee_id")
 
     if employee_id_param is not None:
@@ -18,15 +32,139 @@ def list_leaves():
         except ValueError:
             return jsonify({"error": "employee_id must be an integer."}), 400
 
-        employee = Employee.query.get(employee_id)
-        if not employee:
+        if not employee_id_cache.exists(employee_id):
             return jsonify({"error": "Employee not found."}), 404
 
-        leaves = LeaveRequest.query.filter_by(employee_id=employee_id).all()
-    else:
-        leaves = LeaveRequest.query.all()
+        base = base.filter_by(employee_id=employee_id)
+
+    base, error = _apply_leave_filters(base)
+    if error:
+        return jsonify({"error": error}), 400
+
+    def build():
+        serializer = LeaveRequest.row_serializer(fields)
+        rows = serializer.select(base)
+        return jsonify({"leaves": [serializer.serialize(row) for row in rows]})
+
+    return _conditional_leaves(base, build, fields)
+
+
+@leaves_bp.get("/calendar")
+def leave_calendar():
+    try:
+        start = _date_arg("from")
+        end = _date_arg("to")
+    except ValueError:
+        return jsonify({"error": "from and to must be in YYYY-MM-DD format."}), 400
+    if start is None or end is None:
+        return jsonify({"error": "from and to are required."}), 400
+    if start > end:
+        return jsonify({"error": "from must be on or before to."}), 400
+    if (end - start).days >= MAX_CALENDAR_DAYS:
+        return jsonify({"error": f"Range cannot exceed {MAX_CALENDAR_DAYS} days."}), 400
+
+    status = (request.args.get("status") or "approved").lower()
+    if status not in LEAVE_STATUSES:
+        return jsonify({"error": "Status must be pending, approved, or rejected."}), 400
+
+    statement = (
+        select(
+            LeaveRequest.id,
+            LeaveRequest.employee_id,
+            LeaveRequest.start_date,
+            LeaveRequest.end_date,
+            Employee.first_name,
+            Employee.last_name,
+        )
+        .join(Employee, Employee.id == LeaveRequest.employee_id)
+        .where(
+            LeaveRequest.status == status,
+            LeaveRequest.start_date <= end,
+            LeaveRequest.end_date >= start,
+        )
+        .order_by(Employee.last_name, Employee.first_name, LeaveRequest.id)
+    )
+    department_id = request.args.get("department_id")
+    if department_id is not None:
+        try:
+            statement = statement.where(Employee.department_id == int(department_id))
+        except ValueError:
+            return jsonify({"error": "department_id must be an integer."}), 400
+
+    total_days = (end - start).days + 1
+    out_by_day = [[] for _ in range(total_days)]
+    for row in db.session.execute(statement):
+        entry = {
+            "leave_id": row.id,
+            "employee_id": row.employee_id,
+            "first_name": row.first_name,
+            "last_name": row.last_name,
+        }
+        first = (max(row.start_date, start) - start).days
+        last = (min(row.end_date, end) - start).days
+        for offset in range(first, last + 1):
+            out_by_day[offset].append(entry)
+
+    return jsonify(
+        {
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "status": status,
+            "days": [
+                {"date": (start + timedelta(days=offset)).isoformat(), "out": out}
+                for offset, out in enumerate(out_by_day)
+            ],
+        }
+    )
 
-    return jsonify({"leaves": [leave.to_dict() for leave in leaves]})
+
+@leaves_bp.get("/conflicts")
+def list_conflicts():
+    """Every active leave that overlaps an earlier one for the same employee."""
+    statement = (
+        select(
+            LeaveRequest.id,
+            LeaveRequest.employee_id,
+            LeaveRequest.start_date,
+            LeaveRequest.end_date,
+        )
+        .where(LeaveRequest.status.in_(ACTIVE_LEAVE_STATUSES))
+        .order_by(LeaveRequest.employee_id, LeaveRequest.start_date, LeaveRequest.id)
+    )
+    department_id = request.args.get("department_id")
+    if department_id is not None:
+        try:
+            department_id = int(department_id)
+        except ValueError:
+            return jsonify({"error": "department_id must be an integer."}), 400
+        statement = statement.where(
+            LeaveRequest.employee_id.in_(
+                select(Employee.id).where(Employee.department_id == department_id)
+            )
+        )
+
+    # Sweep each employee's leaves in start order, remembering the one that
+    # reaches furthest; anything starting before it ends is a conflict.
+    conflicts = []
+    current_employee = reaching = None
+    for row in db.session.execute(statement.execution_options(yield_per=1000)):
+        if row.employee_id != current_employee:
+            current_employee, reaching = row.employee_id, row
+            continue
+        if row.start_date <= reaching.end_date:
+            conflicts.append(
+                {
+                    "employee_id": row.employee_id,
+                    "leave_id": row.id,
+                    "start_date": row.start_date.isoformat(),
+                    "end_date": row.end_date.isoformat(),
+                    "conflicts_with": reaching.id,
+                }
+            )
+        if row.end_date > reaching.end_date:
+            reaching = row
+
+    return jsonify({"conflicts": conflicts})
 
 
 @leaves_bp.post("")
@@ -42,7 +180,11 @@ def create_leave():
         end_date=_to_date(payload["end_date"]),
         reason=payload.get("reason"),
         status="pending",
+        leave_type=(payload.get("leave_type") or "vacation").lower(),
     )
+    conflict = _find_overlap(leave.employee_id, leave.start_date, leave.end_date)
+    if conflict:
+        return _overlap_response(conflict)
     db.session.add(leave)
     db.session.commit()
 
@@ -51,8 +193,22 @@ def create_leave():
 
 @leaves_bp.get("/<int:leave_id>")
 def get_leave(leave_id):
-    leave = LeaveRequest.query.get_or_404(leave_id)
-    return jsonify({"leave": leave.to_dict()})
+    fields, error = parse_fieldset(LeaveRequest)
+    if error:
+        return jsonify({"error": error}), 400
+
+    def build():
+        leave = LeaveRequest.query.options(
+            *LeaveRequest.load_options(fields)
+        ).get_or_404(leave_id)
+        return jsonify({"leave": leave.to_dict(fields)})
+
+    return _conditional_leaves(
+        LeaveRequest.query.filter(LeaveRequest.id == leave_id),
+        build,
+        fields,
+        require_rows=True,
+    )
 
 
 @leaves_bp.patch("/<int:leave_id>")
@@ -60,17 +216,46 @@ def update_leave(leave_id):
     leave = LeaveRequest.query.get_or_404(leave_id)
     payload = request.get_json() or {}
 
+    status = leave.status
     if "status" in payload:
         status = payload["status"].lower()
-        if status not in {"pending", "approved", "rejected"}:
+        if status not in LEAVE_STATUSES:
             return jsonify({"error": "Status must be pending, approved, or rejected."}), 400
-        leave.status = status
 
-    if "start_date" in payload:
-        leave.start_date = _to_date(payload["start_date"])
+    leave_type = leave.leave_type
+    if "leave_type" in payload:
+        leave_type = (payload["leave_type"] or "").lower()
+        if leave_type not in LEAVE_TYPES:
+            return jsonify({"error": "leave_type must be sick, vacation, or maternity."}), 400
 
-    if "end_date" in payload:
-        leave.end_date = _to_date(payload["end_date"])
+    try:
+        start_date = _to_date(payload.get("start_date") or leave.start_date)
+        end_date = _to_date(payload.get("end_date") or leave.end_date)
+    except ValueError:
+        return jsonify({"error": "Dates must be in YYYY-MM-DD format."}), 400
+    if start_date > end_date:
+        return jsonify({"error": "start_date must be on or before end_date."}), 400
+
+    if status != "rejected" and (
+        leave.status == "rejected"
+        or start_date != leave.start_date
+        or end_date != leave.end_date
+    ):
+        conflict = _find_overlap(
+            leave.employee_id, start_date, end_date, exclude_id=leave.id
+        )
+        if conflict:
+            return _overlap_response(conflict)
+
+    error = _settle_balance(leave, status, leave_type, start_date, end_date)
+    if error:
+        db.session.rollback()
+        return jsonify({"error": error}), 409
+
+    leave.status = status
+    leave.leave_type = leave_type
+    leave.start_date = start_date
+    leave.end_date = end_date
 
     if "reason" in payload:
         leave.reason = payload["reason"]
@@ -79,6 +264,221 @@ def update_leave(leave_id):
     return jsonify({"leave": leave.to_dict()})
 
 
+@leaves_bp.post("/bulk-approve")
+def bulk_approve():
+    payload = request.get_json() or {}
+    leave_ids = payload.get("leave_ids")
+    if (
+        not isinstance(leave_ids, list)
+        or not leave_ids
+        or not all(isinstance(leave_id, int) for leave_id in leave_ids)
+    ):
+        return jsonify({"error": "leave_ids must be a non-empty list of integers."}), 400
+    if len(leave_ids) > MAX_BULK_APPROVALS:
+        return jsonify({"error": f"At most {MAX_BULK_APPROVALS} leaves per request."}), 400
+
+    leaves = {
+        leave.id: leave
+        for leave in LeaveRequest.query.filter(LeaveRequest.id.in_(leave_ids))
+    }
+    approved = []
+    errors = []
+    for leave_id in dict.fromkeys(leave_ids):
+        leave = leaves.get(leave_id)
+        if leave is None:
+            errors.append({"leave_id": leave_id, "error": "Leave not found."})
+            continue
+        if leave.status == "approved":
+            approved.append(leave_id)
+            continue
+        if leave.status == "rejected" and _find_overlap(
+            leave.employee_id, leave.start_date, leave.end_date, exclude_id=leave.id
+        ):
+            errors.append(
+                {"leave_id": leave_id, "error": "Leave overlaps an existing request."}
+            )
+            continue
+        error = _settle_balance(
+            leave, "approved", leave.leave_type, leave.start_date, leave.end_date
+        )
+        if error:
+            errors.append({"leave_id": leave_id, "error": error})
+            continue
+        approved.append(leave_id)
+
+    db.session.commit()
+    return jsonify({"approved": approved, "errors": errors})
+
+
+def _charged_days(status, leave_type, start_date, end_date):
+    if status != "approved":
+        return {}
+    return {leave_type: (end_date - start_date).days + 1}
+
+
+def _settle_balance(leave, status, leave_type, start_date, end_date):
+    """Move ``leave`` to its new state and charge or refund the balance.
+
+    Each bucket changes with one conditional UPDATE, so concurrent approvals
+    can never overdraw it. Charges go first, then the leave row is claimed
+    by compare-and-set against the values it was loaded with, and refunds go
+    last, so a failure at any step leaves nothing half-applied once the
+    caller has undone any charges. Returns an error message or ``None``.
+    """
+    new = _charged_days(status, leave_type, start_date, end_date)
+    old = _charged_days(leave.status, leave.leave_type, leave.start_date, leave.end_date)
+    deltas = {
+        bucket: new.get(bucket, 0) - old.get(bucket, 0) for bucket in LEAVE_TYPES
+    }
+    if not any(deltas.values()):
+        return None
+
+    charged = []
+    for bucket, days in deltas.items():
+        if days > 0:
+            if not _adjust_balance(leave.employee_id, bucket, days):
+                _refund(leave.employee_id, charged)
+                return f"Insufficient {bucket} leave balance."
+            charged.append((bucket, days))
+
+    table = LeaveRequest.__table__
+    claimed = db.session.execute(
+        table.update()
+        .where(
+            table.c.id == leave.id,
+            table.c.status == leave.status,
+            table.c.leave_type == leave.leave_type,
+            table.c.start_date == leave.start_date,
+            table.c.end_date == leave.end_date,
+        )
+        .values(
+            status=status,
+            leave_type=leave_type,
+            start_date=start_date,
+            end_date=end_date,
+            updated_at=datetime.utcnow(),
+        )
+    ).rowcount
+    if not claimed:
+        _refund(leave.employee_id, charged)
+        return "Leave was changed by another request; retry."
+
+    for bucket, days in deltas.items():
+        if days < 0:
+            _adjust_balance(leave.employee_id, bucket, days)
+    return None
+
+
+def _adjust_balance(employee_id, bucket, days):
+    table = Employee.__table__
+    used = table.c[f"{bucket}_leave_used"]
+    total = table.c[f"{bucket}_leave_total"]
+    statement = table.update().where(table.c.id == employee_id)
+    if days > 0:
+        statement = statement.where(used + days <= total).values(
+            {used: used + days}
+        )
+    else:
+        statement = statement.values({used: func.max(used + days, 0)})
+    statement = statement.values(updated_at=datetime.utcnow())
+    return db.session.execute(statement).rowcount == 1
+
+
+def _refund(employee_id, charged):
+    for bucket, days in charged:
+        _adjust_balance(employee_id, bucket, -days)
+
+
+def _find_overlap(employee_id, start_date, end_date, exclude_id=None):
+    """Return the active leave overlapping ``[start_date, end_date]``, if any.
+
+    Active leaves never overlap each other, so sorted by start they are also
+    sorted by end: only the last one starting on or before ``end_date`` can
+    reach into the range. That makes this one descending probe of
+    ix_leave_requests_employee_interval rather than a scan of the history.
+    """
+    query = LeaveRequest.query.filter(
+        LeaveRequest.employee_id == employee_id,
+        LeaveRequest.status.in_(ACTIVE_LEAVE_STATUSES),
+        LeaveRequest.start_date <= end_date,
+    )
+    if exclude_id is not None:
+        query = query.filter(LeaveRequest.id != exclude_id)
+    candidate = (
+        query.with_entities(
+            LeaveRequest.id, LeaveRequest.start_date, LeaveRequest.end_date
+        )
+        .order_by(LeaveRequest.start_date.desc())
+        .first()
+    )
+    if candidate and candidate.end_date >= start_date:
+        return candidate
+    return None
+
+
+def _overlap_response(conflict):
+    return (
+        jsonify(
+            {
+                "error": "Leave overlaps an existing request.",
+                "conflicts_with": {
+                    "id": conflict.id,
+                    "start_date": conflict.start_date.isoformat(),
+                    "end_date": conflict.end_date.isoformat(),
+                },
+            }
+        ),
+        409,
+    )
+
+
+def _apply_leave_filters(query):
+    status = request.args.get("status")
+    if status is not None:
+        status = status.lower()
+        if status not in LEAVE_STATUSES:
+            return None, "Status must be pending, approved, or rejected."
+        query = query.filter(LeaveRequest.status == status)
+
+    department_id = request.args.get("department_id")
+    if department_id is not None:
+        try:
+            department_id = int(department_id)
+        except ValueError:
+            return None, "department_id must be an integer."
+        query = query.filter(
+            LeaveRequest.employee_id.in_(
+                select(Employee.id).where(Employee.department_id == department_id)
+            )
+        )
+
+    try:
+        start = _date_arg("from")
+        end = _date_arg("to")
+    except ValueError:
+        return None, "from and to must be in YYYY-MM-DD format."
+    # Keep every leave that overlaps the requested window.
+    if end is not None:
+        query = query.filter(LeaveRequest.start_date <= end)
+    if start is not None:
+        query = query.filter(LeaveRequest.end_date >= start)
+    return query, None
+
+
+def _date_arg(name):
+    value = request.args.get(name)
+    return _to_date(value) if value else None
+
+
+def _conditional_leaves(query, build, fields, require_rows=False):
+    timestamps = [LeaveRequest.updated_at]
+    if fields is None or "employee" in fields:
+        # The embedded employee name changes with the employee row.
+        query = query.outerjoin(LeaveRequest.employee)
+        timestamps.append(Employee.updated_at)
+    return conditional_get(query, build, timestamps, require_rows=require_rows)
+
+
 def _validate_leave_payload(payload, creation=False):
     errors = []
     employee_id = payload.get("employee_id")
@@ -92,9 +492,13 @@ def _validate_leave_payload(payload, creation=False):
     if creation and not end_date:
         errors.append("end_date is required.")
 
-    if employee_id and not Employee.query.get(employee_id):
+    if employee_id and not employee_id_cache.exists(employee_id):
         errors.append("employee_id is invalid.")
 
+    leave_type = payload.get("leave_type")
+    if leave_type is not None and str(leave_type).lower() not in LEAVE_TYPES:
+        errors.append("leave_type must be sick, vacation, or maternity.")
+
     try:
         if start_date:
             _ = _to_date(start_date)
@@ -102,6 +506,7 @@ def _validate_leave_payload(payload, creation=False):
             _ = _to_date(end_date)
     except ValueError:
         errors.append("Dates must be in YYYY-MM-DD format.")
+        return errors
 
     if start_date and end_date:
         start = _to_date(start_date)
@@ -115,7 +520,9 @@ def _validate_leave_payload(payload, creation=False):
 def _to_date(value):
     if isinstance(value, datetime):
         return value.date()
+    if isinstance(value, date):
+        return value
     if isinstance(value, str):
         return datetime.strptime(value, "%Y-%m-%d").date()
-    return value
+    raise ValueError(f"Not a date: {value!r}")
 
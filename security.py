@@ -0,0 +1,151 @@
+"""Password hashing and signed session tokens.
+
+Passwords are hashed with werkzeug's KDFs; ``PASSWORD_HASH_METHOD`` sets the
+algorithm and cost (e.g. ``pbkdf2:sha256:600000`` or ``scrypt:32768:8:1``).
+Rows still holding a plaintext password from before hashing existed are
+accepted once and rehashed on the next successful login.
+
+Session tokens are HMAC-signed with ``SECRET_KEY`` and verified without a
+database lookup. Verified tokens and the user payload behind them are kept
+in a bounded LRU for ``AUTH_CACHE_TTL`` seconds (never past the token's own
+expiry) so repeat requests skip even the signature check.
+"""
+
+import hmac
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from werkzeug.security import check_password_hash, generate_password_hash
+
+HASH_PREFIXES = ("pbkdf2:", "scrypt:")
+TOKEN_SALT = "auth-token"
+_dummy_hashes = {}
+
+
+def hash_password(password):
+    return generate_password_hash(
+        password, method=current_app.config["PASSWORD_HASH_METHOD"]
+    )
+
+
+def hash_passwords(passwords, memo=None):
+    """Hash many passwords, deriving each distinct plaintext only once.
+
+    Bulk paths (import, rehash) would otherwise pay the KDF per row; rows
+    sharing a plaintext, typically the default password, share one hash.
+    Pass the same ``memo`` dict across batches to share it further.
+    """
+    memo = {} if memo is None else memo
+    hashed = []
+    for password in passwords:
+        if password not in memo:
+            memo[password] = hash_password(password)
+        hashed.append(memo[password])
+    return hashed
+
+
+def is_hashed(stored):
+    return stored.startswith(HASH_PREFIXES)
+
+
+def verify_password(stored, password):
+    if stored is None:
+        # Spend the same KDF time when the account doesn't exist, so login
+        # timing doesn't reveal which emails are registered.
+        _check_dummy(password)
+        return False
+    if is_hashed(stored):
+        return check_password_hash(stored, password)
+    return hmac.compare_digest(stored.encode("utf-8"), password.encode("utf-8"))
+
+
+def _check_dummy(password):
+    method = current_app.config["PASSWORD_HASH_METHOD"]
+    dummy = _dummy_hashes.get(method)
+    if dummy is None:
+        # Building the dummy costs one KDF run, the same as checking it.
+        _dummy_hashes[method] = generate_password_hash("not-a-real-password", method=method)
+        return
+    check_password_hash(dummy, password)
+
+
+def needs_rehash(stored):
+    method = stored.split("$", 1)[0] if is_hashed(stored) else None
+    return method != current_app.config["PASSWORD_HASH_METHOD"]
+
+
+def _serializer():
+    return URLSafeTimedSerializer(current_app.config["SECRET_KEY"], salt=TOKEN_SALT)
+
+
+def issue_token(user_id):
+    return _serializer().dumps({"uid": user_id})
+
+
+def read_token(token):
+    """``(user_id, expires_at)`` for a valid, unexpired token, else ``(None, None)``.
+
+    ``expires_at`` is a ``time.time()`` timestamp.
+    """
+    ttl = current_app.config["AUTH_TOKEN_TTL"]
+    try:
+        data, issued = _serializer().loads(token, max_age=ttl, return_timestamp=True)
+    except BadSignature:
+        return None, None
+    return data.get("uid"), issued.timestamp() + ttl
+
+
+class TokenCache:
+    """Bounded LRU of ``token -> (user_id, payload)`` entries with a TTL."""
+
+    def __init__(self, maxsize=10000, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, token, user_id, payload, expires_at=None):
+        """Cache for ``ttl`` seconds, but never past the token's own ``expires_at``."""
+        now = time.monotonic()
+        deadline = now + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, now + expires_at - time.time())
+        with self._lock:
+            self._entries[token] = (deadline, user_id, payload)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard_user(self, user_id):
+        with self._lock:
+            for token in [t for t, entry in self._entries.items() if entry[1] == user_id]:
+                del self._entries[token]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+        }
+
+
+token_cache = TokenCache()
@@ -1,14 +1,33 @@
 from datetime import date, datetime, timedelta
 
+from sqlalchemy.exc import IntegrityError
+
+import rollups
 from db import db
 from models import AttendanceRecord, Department, Employee, LeaveRequest
+from security import hash_password
 
 
 def seed_database():
-    """Populate the database with deterministic demo data."""
+    """Populate an empty database with deterministic demo data.
+
+    Returns ``False`` when the data is already there, including when another
+    worker seeded it concurrently.
+    """
     if Department.query.first():
-        return
+        return False
+
+    try:
+        _insert_demo_data()
+    except IntegrityError:
+        db.session.rollback()
+        return False
+
+    rollups.rebuild()
+    return True
+
 
+def _insert_demo_data():
     departments = [
         Department(name="Human Resources", description="Hiring and people ops"),
         Department(name="Engineering", description="Product development"),
@@ -18,6 +37,7 @@ def seed_database():
     db.session.add_all(departments)
     db.session.flush()
 
+    default_password = hash_password("password123")
     employees = [
         Employee(
             first_name="Ava",
@@ -25,7 +45,7 @@ def seed_database():
             email="ava.stone@example.com",
             role="HR Manager",
             gender="female",
-            password="password123",
+            password=default_password,
             department_id=departments[0].id,
             hire_date=date(2020, 3, 15),
             sick_leave_total=12,
@@ -41,7 +61,7 @@ def seed_database():
             email="liam.garcia@example.com",
             role="People Ops Specialist",
             gender="male",
-            password="password123",
+            password=default_password,
             department_id=departments[0].id,
             hire_date=date(2022, 7, 1),
             sick_leave_total=10,
@@ -55,7 +75,7 @@ def seed_database():
             email="maya.chen@example.com",
             role="Senior Engineer",
             gender="female",
-            password="password123",
+            password=default_password,
             department_id=departments[1].id,
             hire_date=date(2019, 11, 4),
             sick_leave_total=14,
@@ -71,7 +91,7 @@ def seed_database():
             email="ethan.brooks@example.com",
             role="Staff Engineer",
             gender="male",
-            password="password123",
+            password=default_password,
             department_id=departments[1].id,
             hire_date=date(2018, 5, 22),
             sick_leave_total=12,
@@ -85,7 +105,7 @@ def seed_database():
             email="noah.patel@example.com",
             role="Account Executive",
             gender="male",
-            password="password123",
+            password=default_password,
             department_id=departments[2].id,
             hire_date=date(2021, 2, 9),
             sick_leave_total=10,
@@ -99,7 +119,7 @@ def seed_database():
             email="zoe.kim@example.com",
             role="Finance Analyst",
             gender="female",
-            password="password123",
+            password=default_password,
             department_id=departments[3].id,
             hire_date=date(2023, 1, 16),
             sick_leave_total=12,
@@ -7,11 +7,42 @@ cd "${ROOT}"
 export PIPENV_VENV_IN_PROJECT=1
 
 export FLASK_APP=app
-HOST="${HOST:-0.0.0.0}"
-PORT="${PORT:-5000}"
+export HOST="${HOST:-0.0.0.0}"
+export PORT="${PORT:-5000}"
+# "production" serves with pre-forked gunicorn workers; "development" runs the
+# single-process Flask server with the reloader.
+APP_ENV="${APP_ENV:-production}"
 
 echo "[start] Ensuring pipenv is installed..."
 python3 -m pip install --upgrade pip pipenv
 
-echo "[start] Starting Dummy HR API on ${HOST}:${PORT} via Pipenv..."
-pipenv run flask run --host "${HOST}" --port "${PORT}" --reload
\ No newline at end of file
+echo "[start] Preparing the database..."
+pipenv run flask init-db
+
+# The schema and demo data are in place, so (re)started workers only verify
+# the schema version instead of migrating and probing for seed data.
+export AUTO_MIGRATE=0 SEED_ON_STARTUP=0
+
+if [[ "${APP_ENV}" == "development" ]]; then
+  echo "[start] Starting Dummy HR API on ${HOST}:${PORT} (development server)..."
+  exec pipenv run flask run --host "${HOST}" --port "${PORT}" --reload
+fi
+
+# Workers share one metrics directory so /metrics reports all of them. By
+# default that is a fresh private directory; a caller-supplied one only has
+# the previous run's registry files (<pid>-<hex>.json and retired.json)
+# cleared, never anything else in it.
+if [[ -z "${METRICS_DIR:-}" ]]; then
+  METRICS_DIR="$(mktemp -d "${TMPDIR:-/tmp}/dummy-hr-metrics.XXXXXX")"
+else
+  mkdir -p "${METRICS_DIR}"
+  for file in "${METRICS_DIR}"/*.json; do
+    if [[ "${file##*/}" =~ ^([0-9]+-[0-9a-f]{8}|retired)\.json$ ]]; then
+      rm -f "${file}"
+    fi
+  done
+fi
+export METRICS_DIR
+
+echo "[start] Starting Dummy HR API on ${HOST}:${PORT} via gunicorn..."
+exec pipenv run gunicorn --config gunicorn.conf.py app:app
@@ -0,0 +1,310 @@
+"""Deterministic, production-sized synthetic data for load testing.
+
+``generate`` writes departments, employees, leave requests and attendance
+with Core ``executemany`` inserts in batches, then rebuilds the attendance
+rollup. Every random choice comes from RNGs derived from ``seed`` (one per
+stage, one per employee for attendance), so the same arguments produce the
+same rows regardless of batch size. Dates are laid out relative to
+``end_date``; pass it explicitly for byte-identical reruns on other days.
+Department names and emails carry the seed, so datasets generated with
+different seeds can share a database.
+
+Approved leaves are charged to the employee's balances, never beyond the
+total, active leaves of one employee never overlap, and nobody clocks in on
+a weekend, before being hired, or on a day of approved leave.
+"""
+
+import random
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+
+from sqlalchemy import insert
+
+import rollups
+from db import db
+from models import AttendanceRecord, Department, Employee, LeaveRequest
+from security import hash_password
+
+DEFAULT_BATCH_SIZE = 5000
+UPCOMING_LEAVE_DAYS = 60
+
+AREAS = [
+    ("Engineering", ["Software Engineer", "Senior Engineer", "Staff Engineer", "QA Engineer"]),
+    ("Sales", ["Account Executive", "Sales Development Rep", "Sales Manager"]),
+    ("Customer Support", ["Support Specialist", "Support Lead"]),
+    ("Finance", ["Finance Analyst", "Accountant", "Controller"]),
+    ("Human Resources", ["HR Generalist", "Recruiter", "People Ops Specialist"]),
+    ("Marketing", ["Marketing Manager", "Content Strategist", "Designer"]),
+    ("Operations", ["Operations Analyst", "Program Manager"]),
+    ("Product", ["Product Manager", "Product Analyst"]),
+    ("Legal", ["Counsel", "Paralegal"]),
+    ("Facilities", ["Facilities Coordinator", "Office Manager"]),
+]
+REGIONS = ["Berlin", "Lisbon", "Austin", "Toronto", "Singapore", "Nairobi", "Sydney"]
+FIRST_NAMES = {
+    "female": ["Ava", "Maya", "Zoe", "Lena", "Priya", "Sofia", "Amara", "Hana", "Ines", "Chloe"],
+    "male": ["Liam", "Ethan", "Noah", "Omar", "Mateo", "Kenji", "Lucas", "Arjun", "Felix", "Jonah"],
+    "non-binary": ["Alex", "Sam", "Robin", "Kai", "Jules"],
+    "unspecified": ["Taylor", "Jordan", "Casey", "Morgan", "Riley"],
+}
+LAST_NAMES = [
+    "Stone", "Garcia", "Chen", "Brooks", "Patel", "Kim", "Okafor", "Novak", "Silva",
+    "Fischer", "Haddad", "Tanaka", "Rossi", "Nguyen", "Kowalski", "Larsen", "Mensah",
+]
+GENDERS = [("female", 48), ("male", 48), ("non-binary", 2), ("unspecified", 2)]
+LEAVE_REASONS = {
+    "vacation": ["Family trip", "Holiday", "Personal time", "Wedding", "Moving house"],
+    "sick": ["Flu", "Medical appointment", "Recovery", "Migraine"],
+    "maternity": ["Maternity leave"],
+}
+
+
+def generate(
+    departments=10,
+    employees=1000,
+    years=1.0,
+    leave_density=4.0,
+    attendance_rate=0.96,
+    seed=42,
+    end_date=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+):
+    """Insert a synthetic dataset and return the number of rows per table."""
+    end_date = end_date or date.today()
+    start_date = end_date - timedelta(days=round(365 * years))
+
+    department_ids = _insert_returning_ids(
+        Department, _department_rows(departments, seed), batch_size
+    )
+
+    people = [
+        _person(index, department_ids, start_date, end_date, leave_density, seed)
+        for index in range(employees)
+    ]
+    password = hash_password("password123")
+    for person in people:
+        person["employee"]["password"] = password
+    employee_ids = _insert_returning_ids(
+        Employee, (person["employee"] for person in people), batch_size
+    )
+
+    leave_rows = (
+        dict(leave, employee_id=employee_id)
+        for person, employee_id in zip(people, employee_ids)
+        for leave in person["leaves"]
+    )
+    leave_count = _insert_batches(LeaveRequest, leave_rows, batch_size)
+
+    attendance_rows = (
+        row
+        for index, (person, employee_id) in enumerate(zip(people, employee_ids))
+        for row in _attendance(
+            employee_id,
+            person,
+            start_date,
+            end_date,
+            attendance_rate,
+            random.Random(f"{seed}:attendance:{index}"),
+        )
+    )
+    attendance_count = _insert_batches(AttendanceRecord, attendance_rows, batch_size)
+
+    db.session.commit()
+    rollup_count = rollups.rebuild()
+    return {
+        "departments": len(department_ids),
+        "employees": len(employee_ids),
+        "leave_requests": leave_count,
+        "attendance_records": attendance_count,
+        "attendance_daily_rollups": rollup_count,
+    }
+
+
+def conflicts(departments=10, employees=1000, seed=42):
+    """``(department names, emails)`` that ``generate`` would insert but
+    already exist, counted, so a clashing run can be refused up front."""
+    names = [row["name"] for row in _department_rows(departments, seed)]
+    emails = (_identity(index, seed)[-1] for index in range(employees))
+    return (
+        _count_existing(Department.name, names),
+        _count_existing(Employee.email, emails),
+    )
+
+
+def _count_existing(column, values):
+    count = 0
+    for batch in _batches(values, 500):
+        count += db.session.query(column).filter(column.in_(batch)).count()
+    return count
+
+
+def _insert_returning_ids(model, rows, batch_size):
+    table = model.__table__
+    statement = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+    ids = []
+    for batch in _batches(rows, batch_size):
+        ids.extend(db.session.execute(statement, batch).scalars())
+    return ids
+
+
+def _insert_batches(model, rows, batch_size):
+    statement = insert(model.__table__)
+    count = 0
+    for batch in _batches(rows, batch_size):
+        db.session.execute(statement, batch)
+        count += len(batch)
+    return count
+
+
+def _batches(rows, batch_size):
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+def _department_rows(count, seed):
+    rng = random.Random(f"{seed}:departments")
+    created = datetime(2015, 1, 1)
+    for index in range(count):
+        area, _roles = AREAS[index % len(AREAS)]
+        region = REGIONS[(index // len(AREAS)) % len(REGIONS)]
+        cycle = index // (len(AREAS) * len(REGIONS))
+        place = region if not cycle else f"{region} {cycle + 1}"
+        # The seed keeps names unique across runs with different seeds.
+        name = f"{area} ({place}) s{seed}"
+        yield {
+            "name": name,
+            "description": f"{area} team based in {region}",
+            "created_at": created + timedelta(days=rng.randrange(365)),
+            "updated_at": created + timedelta(days=365 + rng.randrange(365)),
+        }
+
+
+def _identity(index, seed):
+    rng = random.Random(f"{seed}:employee:{index}")
+    gender = rng.choices(
+        [gender for gender, _ in GENDERS], [weight for _, weight in GENDERS]
+    )[0]
+    first_name = rng.choice(FIRST_NAMES[gender])
+    last_name = rng.choice(LAST_NAMES)
+    email = f"{first_name}.{last_name}.{index + 1}@s{seed}.example.com".lower()
+    return rng, gender, first_name, last_name, email
+
+
+def _person(index, department_ids, start_date, end_date, leave_density, seed):
+    rng, gender, first_name, last_name, email = _identity(index, seed)
+    department_index = rng.randrange(len(department_ids))
+    _area, roles = AREAS[department_index % len(AREAS)]
+    hire_date = start_date - timedelta(days=rng.randrange(-300, 8 * 365))
+    hire_date = min(hire_date, end_date - timedelta(days=30))
+    created_at = datetime.combine(hire_date, time(9))
+
+    totals = {
+        "sick": rng.randint(10, 14),
+        "vacation": rng.randint(15, 25),
+        "maternity": 90 if gender == "female" else 0,
+    }
+    used = dict.fromkeys(totals, 0)
+    leaves = _leaves(rng, hire_date, start_date, end_date, leave_density, totals, used)
+
+    return {
+        "employee": {
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": email,
+            "role": rng.choice(roles),
+            "gender": gender,
+            "department_id": department_ids[department_index],
+            "hire_date": hire_date,
+            "sick_leave_total": totals["sick"],
+            "sick_leave_used": used["sick"],
+            "vacation_leave_total": totals["vacation"],
+            "vacation_leave_used": used["vacation"],
+            "maternity_leave_total": totals["maternity"],
+            "maternity_leave_used": used["maternity"],
+            "created_at": created_at,
+            "updated_at": created_at,
+        },
+        "leaves": leaves,
+        "days_off": {
+            leave["start_date"] + timedelta(days=offset)
+            for leave in leaves
+            if leave["status"] == "approved"
+            for offset in range((leave["end_date"] - leave["start_date"]).days + 1)
+        },
+        "hire_date": hire_date,
+    }
+
+
+def _leaves(rng, hire_date, start_date, end_date, density, totals, used):
+    first_day = max(start_date, hire_date)
+    window = (end_date + timedelta(days=UPCOMING_LEAVE_DAYS) - first_day).days
+    if window <= 0:
+        return []
+
+    expected = density * window / 365
+    count = int(expected) + (rng.random() < expected - int(expected))
+    taken = []
+    leaves = []
+    for _ in range(count):
+        leave_type = rng.choices(["vacation", "sick", "maternity"], [60, 38, 2])[0]
+        if leave_type == "maternity" and not totals["maternity"]:
+            leave_type = "vacation"
+        length = {"vacation": rng.randint(1, 10), "sick": rng.randint(1, 3)}.get(
+            leave_type, 90
+        )
+        start = first_day + timedelta(days=rng.randrange(window))
+        end = start + timedelta(days=length - 1)
+        if any(start <= other_end and end >= other_start for other_start, other_end in taken):
+            continue
+
+        status = _leave_status(rng, start, end_date)
+        if status == "approved":
+            if used[leave_type] + length > totals[leave_type]:
+                status = "rejected"
+            else:
+                used[leave_type] += length
+        taken.append((start, end))
+
+        requested_at = datetime.combine(
+            min(start, end_date) - timedelta(days=rng.randint(1, 30)), time(10)
+        )
+        leaves.append(
+            {
+                "start_date": start,
+                "end_date": end,
+                "reason": rng.choice(LEAVE_REASONS[leave_type]),
+                "status": status,
+                "leave_type": leave_type,
+                "created_at": requested_at,
+                "updated_at": requested_at + timedelta(days=rng.randint(0, 3)),
+            }
+        )
+    return leaves
+
+
+def _leave_status(rng, start, end_date):
+    if start >= end_date:
+        return rng.choices(["pending", "approved"], [70, 30])[0]
+    return rng.choices(["approved", "rejected", "pending"], [85, 10, 5])[0]
+
+
+def _attendance(employee_id, person, start_date, end_date, rate, rng):
+    day = max(start_date, person["hire_date"])
+    days_off = person["days_off"]
+    while day < end_date:
+        if day.weekday() < 5 and day not in days_off and rng.random() < rate:
+            minutes_in = min(max(rng.gauss(90, 30), 30), 240)
+            check_in = datetime.combine(day, time(7)) + timedelta(
+                minutes=round(minutes_in), seconds=rng.randrange(60)
+            )
+            worked = min(max(rng.gauss(8.5 * 3600, 2400), 4 * 3600), 11 * 3600)
+            check_out = check_in + timedelta(seconds=round(worked))
+            yield {
+                "employee_id": employee_id,
+                "check_in": check_in,
+                "check_out": check_out,
+                "created_at": check_in,
+                "updated_at": check_out,
+            }
+        day += timedelta(days=1)